@@ -13,14 +13,44 @@ import httpx
 
 from src.config import GAMMA_API_BASE
 
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Try to import orjson (optional, falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 SEEN_MARKETS_FILE = "./data/seen_markets.json"
+FETCH_TIMEOUT = 30  # Seconds per Gamma page; large pages are slow
+# Idle connections outlive the scan interval so the next scan skips the TLS handshake
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=150)
 
 
 def log(msg: str):
     print(f"[NEW MARKETS] {msg}", flush=True)
 
 
+def _loads(data):
+    """Decode JSON from bytes or str, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj) -> bytes:
+    """Encode JSON to bytes, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
 @dataclass
 class NewMarketOpportunity:
     """A newly detected market with potential mispricing."""
@@ -40,8 +70,12 @@ class NewMarketOpportunity:
 class NewMarketMonitor:
     """Monitor for newly created Polymarket markets."""
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30)
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        # A caller-supplied client is shared (and closed by the caller)
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE, timeout=FETCH_TIMEOUT, limits=HTTP_LIMITS
+        )
         self.seen_markets = self._load_seen_markets()
         self._warmed_up = len(self.seen_markets) > 0  # Skip trading on first scan if empty
         log(f"Loaded {len(self.seen_markets)} seen markets")
@@ -53,8 +87,7 @@ class NewMarketMonitor:
         try:
             path = Path(SEEN_MARKETS_FILE)
             if path.exists():
-                with open(path) as f:
-                    return set(json.load(f))
+                return set(_loads(path.read_bytes()))
         except Exception:
             pass
         return set()
@@ -64,8 +97,7 @@ class NewMarketMonitor:
         try:
             path = Path(SEEN_MARKETS_FILE)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w") as f:
-                json.dump(list(self.seen_markets), f)
+            path.write_bytes(_dumps(list(self.seen_markets)))
         except Exception as e:
             log(f"Error saving seen markets: {e}")
 
@@ -77,11 +109,11 @@ class NewMarketMonitor:
 
         while True:
             url = f"{GAMMA_API_BASE}/events?active=true&closed=false&limit={limit}&offset={offset}"
-            resp = await self.client.get(url)
+            resp = await self.client.get(url, timeout=FETCH_TIMEOUT)
             if resp.status_code != 200:
                 break
 
-            events = resp.json()
+            events = _loads(resp.content)
             if not events:
                 break
 
@@ -117,17 +149,17 @@ class NewMarketMonitor:
             try:
                 # Parse outcomes - can be a JSON string or already a list
                 if isinstance(outcomes_raw, str):
-                    outcomes = json.loads(outcomes_raw)
+                    outcomes = _loads(outcomes_raw)
                 else:
                     outcomes = outcomes_raw
 
                 # Parse prices
-                prices = json.loads(prices_str) if isinstance(prices_str, str) else prices_str
+                prices = _loads(prices_str) if isinstance(prices_str, str) else prices_str
                 prices = [float(p) for p in prices]
 
                 # Parse token IDs - can be a JSON string or already a list
                 if isinstance(clob_token_ids_raw, str):
-                    clob_token_ids = json.loads(clob_token_ids_raw)
+                    clob_token_ids = _loads(clob_token_ids_raw)
                 else:
                     clob_token_ids = clob_token_ids_raw
             except Exception:
@@ -228,7 +260,8 @@ class NewMarketMonitor:
 
     async def close(self):
         self._save_seen_markets()
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
 
 
 async def main():
@@ -10,7 +10,18 @@ from pathlib import Path
 from dataclasses import dataclass, field, asdict
 from typing import Optional
 
+import numpy as np
+
+# Try to import numba (optional, batch sizing falls back to plain NumPy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 PORTFOLIO_FILE = "./data/kelly_portfolio.json"
+LONGSHOT_EDGE_MULTIPLIER = 1.5  # Assume true odds 50% better than market implies
+LONGSHOT_MAX_POSITION_PCT = 0.02  # Max 2% per longshot (they're risky!)
 
 
 @dataclass
@@ -170,6 +181,44 @@ def calculate_position_size(
     return bet_size, kf, edge_pct
 
 
+def _kelly_kernel(entry_prices, fair_values, half_kelly, max_kelly):
+    """Element-wise kelly_fraction() for buys at entry_prices paying $1."""
+    odds = (1.0 - entry_prices) / entry_prices
+    kelly = (odds * fair_values - (1.0 - fair_values)) / odds
+    valid = (fair_values > entry_prices) & (odds > 0) & (fair_values > 0) & (fair_values < 1) & (kelly > 0)
+    kelly = np.minimum(kelly, max_kelly)
+    if half_kelly:
+        kelly = kelly * 0.5
+    return np.where(valid, kelly, 0.0)
+
+
+if NUMBA_AVAILABLE:
+    # An explicit signature compiles at import (loaded from the on-disk cache
+    # after the first run), so the first sizing call never waits on the JIT
+    _kelly_kernel = njit("float64[:](float64[:], float64[:], boolean, float64)", cache=True)(_kelly_kernel)
+
+
+def kelly_batch(
+    entry_prices: np.ndarray,
+    fair_values: np.ndarray,
+    bankroll: float,
+    half_kelly: bool = True,
+    max_position_pct: float = 0.10
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_position_size() over many candidates at once.
+
+    Returns:
+        (bet_sizes_usd, kelly_fractions, edge_pcts) arrays
+    """
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    fair_values = np.asarray(fair_values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fractions = _kelly_kernel(entry_prices, fair_values, half_kelly, 0.25)
+    bet_sizes = np.minimum(bankroll * fractions, bankroll * max_position_pct)
+    return bet_sizes, fractions, (fair_values - entry_prices) * 100
+
+
 def paper_trade_sports_edge(
     portfolio: Portfolio,
     market_slug: str,
@@ -230,7 +279,8 @@ def paper_trade_longshot(
     question: str,
     entry_price: float,  # 0.002 = 0.2 cents
     est_true_prob: float = None,  # Our estimate of true probability
-    category: str = "crypto"
+    category: str = "crypto",
+    sizing: Optional[tuple[float, float]] = None  # (kelly_fraction, edge_pct) from kelly_batch
 ) -> Optional[Position]:
     """
     Paper trade a longshot opportunity.
@@ -239,14 +289,19 @@ def paper_trade_longshot(
     """
     # If no estimate provided, assume 50% edge over market
     if est_true_prob is None:
-        est_true_prob = entry_price * 1.5  # 50% edge assumption
-
-    bet_size, kf, edge_pct = calculate_position_size(
-        entry_price=entry_price,
-        fair_value=est_true_prob,
-        bankroll=portfolio.cash,
-        max_position_pct=0.02  # Max 2% per longshot (they're risky!)
-    )
+        est_true_prob = entry_price * LONGSHOT_EDGE_MULTIPLIER
+
+    if sizing is not None:
+        # Kelly fractions don't depend on bankroll; size against the cash left now
+        kf, edge_pct = sizing
+        bet_size = min(portfolio.cash * kf, portfolio.cash * LONGSHOT_MAX_POSITION_PCT)
+    else:
+        bet_size, kf, edge_pct = calculate_position_size(
+            entry_price=entry_price,
+            fair_value=est_true_prob,
+            bankroll=portfolio.cash,
+            max_position_pct=LONGSHOT_MAX_POSITION_PCT
+        )
 
     if bet_size < 1:
         print(f"[KELLY] Skip longshot: Kelly too small ({kf:.4%})")
@@ -356,7 +411,7 @@ async def run_paper_trades():
         resp = await client.get(url)
         markets = resp.json() if resp.status_code == 200 else []
 
-        longshot_count = 0
+        candidates = []  # (slug, question, price, category)
         for market in markets:
             try:
                 prices_str = market.get("outcomePrices", "[]")
@@ -385,24 +440,36 @@ async def run_paper_trades():
                         else:
                             cat = "other"
 
-                        paper_trade_longshot(
-                            portfolio,
-                            market_slug=slug,
-                            question=question,
-                            entry_price=price,
-                            category=cat
-                        )
-                        longshot_count += 1
+                        candidates.append((slug, question, price, cat))
 
-                        if longshot_count >= 10:  # Max 10 longshots
+                        if len(candidates) >= 10:  # Max 10 longshots
                             break
 
-                if longshot_count >= 10:
+                if len(candidates) >= 10:
                     break
 
             except Exception as e:
                 continue
 
+    # Size every candidate in one pass, then trade them in scan order
+    if candidates:
+        entry_prices = np.array([price for _, _, price, _ in candidates])
+        _, fractions, edges = kelly_batch(
+            entry_prices,
+            entry_prices * LONGSHOT_EDGE_MULTIPLIER,
+            bankroll=1.0,  # Only the fractions are used; sizing happens against live cash
+            max_position_pct=LONGSHOT_MAX_POSITION_PCT
+        )
+        for (slug, question, price, cat), kf, edge_pct in zip(candidates, fractions.tolist(), edges.tolist()):
+            paper_trade_longshot(
+                portfolio,
+                market_slug=slug,
+                question=question,
+                entry_price=price,
+                category=cat,
+                sizing=(kf, edge_pct)
+            )
+
     # =========================================
     # SAVE AND PRINT SUMMARY
     # =========================================
@@ -13,27 +13,92 @@ Usage:
 import argparse
 import asyncio
 import json
+import sqlite3
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import httpx
+import numpy as np
 
 from src.config import GAMMA_API_BASE, CLOB_API_BASE
 from src.new_market_monitor import NewMarketMonitor
 
 # Try to import SDK client (optional, falls back to httpx)
 try:
-    from src.polymarket_client import AsyncPolymarketClient
+    from src.polymarket_client import (
+        AsyncPolymarketClient, AsyncMarketWebSocket, MarketWebSocket, WEBSOCKETS_AVAILABLE,
+    )
     SDK_AVAILABLE = True
 except ImportError:
     SDK_AVAILABLE = False
 
 USE_SDK = True  # Set to True to use SDK, False for raw httpx
+USE_BOOK_STREAM = True  # Keep held positions' books current over the CLOB WebSocket
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Try to import orjson (optional, falls back to compact stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
+# Try to import uvloop (optional, faster event loop for the CLI entry point)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+PAPER_PORTFOLIO_DB = "./data/paper_portfolio.db"
+PAPER_PORTFOLIO_FILE = "./data/paper_portfolio.json"  # Legacy JSON state, imported once
+
+# Portfolio state: counters in meta, live positions and trade history as rows.
+# Only open positions are held in memory; closed trades stay on disk.
+PORTFOLIO_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS positions (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS closed_positions (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    token_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pnl REAL,
+    data TEXT NOT NULL
+);
+"""
 
-PAPER_PORTFOLIO_FILE = "./data/paper_portfolio.json"
+# HTTP connection pooling (shared across all CLOB/Gamma polls)
+CLOB_TIMEOUT = httpx.Timeout(connect=5.0, read=15.0, write=5.0, pool=5.0)
+GAMMA_TIMEOUT = httpx.Timeout(connect=5.0, read=15.0, write=5.0, pool=5.0)
+# Keep idle connections past the longest poll interval so each cycle reuses them
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=150)
+
+# Endpoint URLs parsed once; per-request values go in params
+CLOB_BOOK_URL = httpx.URL(f"{CLOB_API_BASE}/book")
+GAMMA_EVENTS_URL = httpx.URL(f"{GAMMA_API_BASE}/events")
+
+TITLE_SHORT_LEN = 40  # Title prefix shown in log and status lines
+SAVE_DEBOUNCE_SECONDS = 5.0  # Coalesce portfolio saves to at most one per window
 
 # Position sizing
 MAX_POSITION_PCT = 0.05  # Never risk more than 5% per trade
@@ -57,19 +122,269 @@ CUT_LOSS_THRESHOLD = -0.50      # Cut if down 50%+
 # Exit liquidity minimum
 MIN_EXIT_LIQUIDITY_USD = 100.0  # Need at least $100 in bids to enter
 
+# Adaptive polling cadence (floor = hot, cap = idle)
+POLL_HOT_SECONDS = 15           # A position is close to the flip threshold
+POLL_ACTIVE_SECONDS = 60        # Positions open, none near a threshold
+POLL_IDLE_SECONDS = 120         # No open positions to watch
+MAX_CONCURRENT_FETCHES = 20     # Parallel book/event fetches per check (<= pool size)
+GAMMA_SLUG_BATCH = 25           # Slugs per batched /events request (keeps URLs short)
+POLL_HOT_PROXIMITY = 0.80       # "Close" = last bid within 20% of TAKE_PROFIT_MULT
+MAX_BID_DRIFT_PER_MIN = 1.25    # Assume a cold bid rises at most 25% per minute
+BID_CACHE_MAX_AGE_SECONDS = 300 # Re-check every position at least this often
+BOOK_CACHE_TTL_SECONDS = 10.0   # Share one book fetch across the checks in a scan
+BOOK_CACHE_MAX_ENTRIES = 256    # Prune expired books beyond this many tokens
+BOOK_STREAM_RESYNC_SECONDS = 300  # Re-fetch a streamed book from REST after this long
+
 
 def log(msg: str):
     print(f"[PAPER] {msg}", flush=True)
 
 
-@dataclass
-class OrderBookLevel:
-    """A single level in the order book."""
-    price: float
-    size: float  # Number of shares at this price
+def make_pooled_client() -> httpx.AsyncClient:
+    """AsyncClient with keep-alive pooling (and HTTP/2 when h2 is installed)."""
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=CLOB_TIMEOUT, limits=HTTP_LIMITS)
+
+
+def _dumps(obj) -> bytes:
+    """Compact JSON encoding for on-disk state."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+def _loads(data):
+    """Decode JSON stored by _dumps (bytes) or by older versions (str)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Display labels for closed-position statuses; anything else is upper-cased
+STATUS_LABELS = {"won": "WIN", "lost": "LOSS", "profit_5x": "PROFIT"}
 
 
-@dataclass
+def _status_label(status: str) -> str:
+    return STATUS_LABELS.get(status) or status.upper()
+
+
+def _position_id(pos: dict) -> str:
+    """Stable key for a position; positions saved before position_id derive it."""
+    return pos.get("position_id") or f"{pos.get('token_id', '')}:{pos['entry_time']}"
+
+
+def _resolution_fields(event: dict) -> Tuple[bool, Optional[str]]:
+    """Reduce a Gamma event to (closed, first market winner normalized for comparison)."""
+    winner = next((m["winner"] for m in event.get("markets", []) if m.get("winner")), None)
+    return bool(event.get("closed")), winner.lower().strip() if winner else None
+
+
+@dataclass(slots=True)
+class BookSide:
+    """One side of an order book as parallel price/size arrays, best price first."""
+    prices: np.ndarray
+    sizes: np.ndarray  # Number of shares at each price
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @classmethod
+    def from_levels(cls, levels, descending: bool = False) -> "BookSide":
+        """Build from (price, size) pairs, sorted best-first."""
+        levels = list(levels)
+        prices = np.fromiter((price for price, _ in levels), dtype=np.float64, count=len(levels))
+        sizes = np.fromiter((size for _, size in levels), dtype=np.float64, count=len(levels))
+        return cls.from_arrays(prices, sizes, descending)
+
+    @classmethod
+    def from_json(cls, levels: list, descending: bool = False) -> "BookSide":
+        """Build from CLOB {"price": str, "size": str} levels; numpy parses the strings."""
+        prices = np.array([level["price"] for level in levels], dtype=np.float64)
+        sizes = np.array([level["size"] for level in levels], dtype=np.float64)
+        return cls.from_arrays(prices, sizes, descending)
+
+    @classmethod
+    def from_arrays(cls, prices: np.ndarray, sizes: np.ndarray, descending: bool = False) -> "BookSide":
+        """
+        Wrap parallel arrays, reordering best-first if needed.
+
+        Input may arrive in either direction (same contract as
+        polymarket_client._side_arrays): a monotonic side is used as-is or
+        reversed, and only an unordered side is sorted.
+        """
+        # CLOB returns each side already ordered (worst-first), so only sort as a fallback
+        steps = np.diff(prices)
+        if descending:
+            steps = -steps
+        if np.all(steps >= 0):
+            return cls(prices, sizes)
+        if np.all(steps <= 0):
+            return cls(prices[::-1], sizes[::-1])
+        order = np.argsort(-prices if descending else prices, kind="stable")
+        return cls(prices[order], sizes[order])
+
+    @property
+    def best_price(self) -> float:
+        return float(self.prices[0]) if len(self.prices) else 0.0
+
+    def notional(self) -> float:
+        """Total USD value resting on this side."""
+        return float(np.dot(self.prices, self.sizes))
+
+
+EMPTY_SIDE = BookSide(np.empty(0), np.empty(0))
+
+
+class BookStream:
+    """
+    Order books for held tokens, kept current from the CLOB market WebSocket.
+
+    A "book" event replaces a token's snapshot and "price_change" events
+    update single levels (size 0 removes the level). A book counts as
+    missing, so callers re-sync it from REST, when:
+      - the socket disconnects (every streamed book is dropped, and REST
+        snapshots are not installed until it reconnects);
+      - a delta's server timestamp runs backwards (a gap or reordering);
+      - its snapshot is older than BOOK_STREAM_RESYNC_SECONDS.
+    """
+
+    def __init__(self):
+        self.ws = None
+        self.updates = 0
+        self.gaps = 0  # Books dropped for a disconnect or timestamp discontinuity
+        self._tokens: set = set()
+        self._lock = threading.Lock()  # Messages may arrive on the WebSocket thread
+        self._connected = False
+        # token_id -> {"bids"/"asks": {price: size}, "ts": snapshot time,
+        #              "server_ts": last event timestamp (ms), "sides": built BookSides}
+        self._books: Dict[str, dict] = {}
+
+    def start(self, token_ids: list):
+        # Run the socket on our event loop when websockets is installed, else on a thread
+        ws_class = AsyncMarketWebSocket if WEBSOCKETS_AVAILABLE else MarketWebSocket
+        self.ws = ws_class(
+            on_message=self.handle_message, on_connect=self._on_connect, on_disconnect=self._on_disconnect
+        )
+        self.ws.start()
+        self.subscribe(token_ids)
+
+    def _on_connect(self):
+        with self._lock:
+            self._connected = True
+
+    def _on_disconnect(self):
+        # Deltas sent while we were away are lost; the reconnect resubscribes and
+        # the server's fresh "book" snapshots (or REST) rebuild each token
+        with self._lock:
+            self._connected = False
+            self.gaps += len(self._books)
+            self._books.clear()
+
+    async def stop(self):
+        if isinstance(self.ws, AsyncMarketWebSocket):
+            await self.ws.stop()  # Waits for the connection task to finish
+        elif self.ws:
+            self.ws.stop()
+
+    def subscribe(self, token_ids: list):
+        self._tokens.update(token_ids)
+        if self.ws and token_ids:
+            self.ws.subscribe(list(token_ids))
+
+    def unsubscribe(self, token_id: str):
+        self._tokens.discard(token_id)
+        with self._lock:
+            self._books.pop(token_id, None)
+        if self.ws:
+            self.ws.unsubscribe([token_id])
+
+    def handle_message(self, data):
+        """Apply one WebSocket message (a single event or a list of them)."""
+        events = data if isinstance(data, list) else [data]
+        with self._lock:
+            self._connected = True  # A message means the socket is up
+            for event in events:
+                try:
+                    self._apply(event)
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    continue
+
+    def _apply(self, event: dict):
+        kind = event.get("event_type")
+        if kind == "book":
+            self._books[event["asset_id"]] = {
+                "bids": {float(l["price"]): float(l["size"]) for l in event.get("bids") or event.get("buys") or []},
+                "asks": {float(l["price"]): float(l["size"]) for l in event.get("asks") or event.get("sells") or []},
+                "ts": time.monotonic(),
+                "server_ts": _event_ms(event),
+                "sides": None,
+            }
+        elif kind == "price_change":
+            # Newer messages carry per-asset price_changes; older ones one asset_id with changes
+            changes = event.get("price_changes") or [
+                dict(change, asset_id=event["asset_id"]) for change in event.get("changes", [])
+            ]
+            server_ts = _event_ms(event)
+            for change in changes:
+                book = self._books.get(change["asset_id"])
+                if book is None:
+                    continue  # No snapshot to apply the delta to yet
+                if server_ts is not None:
+                    if book["server_ts"] is not None and server_ts < book["server_ts"]:
+                        # Out-of-order delta: the book may be missing updates, so re-sync
+                        del self._books[change["asset_id"]]
+                        self.gaps += 1
+                        continue
+                    book["server_ts"] = server_ts
+                levels = book["bids"] if change["side"].upper() == "BUY" else book["asks"]
+                price, size = float(change["price"]), float(change["size"])
+                if size > 0:
+                    levels[price] = size
+                else:
+                    levels.pop(price, None)
+                book["sides"] = None
+        else:
+            return
+        self.updates += 1
+
+    def seed(self, token_id: str, bids: BookSide, asks: BookSide):
+        """Install a REST snapshot for a streamed token."""
+        if token_id not in self._tokens:
+            return
+        with self._lock:
+            if not self._connected:
+                return  # No deltas would reach it; serving it would freeze the book
+            self._books[token_id] = {
+                "bids": dict(zip(bids.prices.tolist(), bids.sizes.tolist())),
+                "asks": dict(zip(asks.prices.tolist(), asks.sizes.tolist())),
+                "ts": time.monotonic(),
+                "server_ts": None,
+                "sides": (bids, asks),
+            }
+
+    def get(self, token_id: str) -> Optional[Tuple[BookSide, BookSide]]:
+        """Current (bids, asks) for a token, or None if unknown or due for a re-sync."""
+        with self._lock:
+            book = self._books.get(token_id)
+            if book is None or time.monotonic() - book["ts"] > BOOK_STREAM_RESYNC_SECONDS:
+                return None
+            if book["sides"] is None:
+                book["sides"] = (_side_from_map(book["bids"], True), _side_from_map(book["asks"], False))
+            return book["sides"]
+
+
+def _event_ms(event: dict) -> Optional[int]:
+    """Server timestamp of a market event in ms, if it carries one."""
+    ts = event.get("timestamp")
+    return int(ts) if ts is not None else None
+
+
+def _side_from_map(levels: dict, descending: bool) -> BookSide:
+    prices = np.fromiter(levels.keys(), dtype=np.float64, count=len(levels))
+    sizes = np.fromiter(levels.values(), dtype=np.float64, count=len(levels))
+    return BookSide.from_arrays(prices, sizes, descending)
+
+
+@dataclass(slots=True)
 class FillResult:
     """Result of simulating a fill against the order book."""
     shares_filled: float
@@ -82,39 +397,102 @@ class FillResult:
 class PaperTrader:
     """Realistic paper trading simulator with order book depth checking."""
 
-    def __init__(self, starting_balance: float = 10000.0):
+    def __init__(self, starting_balance: float = 10000.0, client: Optional[httpx.AsyncClient] = None):
         self.starting_balance = starting_balance
+        self.db = self._open_db()
+        self._db_lock = threading.RLock()
+        # Closed positions not yet written to closed_positions
+        self._pending_closed: list = []
+        # Open positions added or modified since the last save
+        self._changed_positions: list = []
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
         self.portfolio = self._load_portfolio()
-        self.client = httpx.AsyncClient(timeout=30)
-        
+        # Running total of amount_invested across open positions
+        self._open_value = sum(pos["amount_invested"] for pos in self.portfolio["positions"])
+        # A caller-supplied client is shared (and closed by the caller)
+        self._owns_client = client is None
+        self.client = client or make_pooled_client()
+        # Last seen best bid per token: token_id -> (bid, monotonic ts)
+        self._bid_cache: Dict[str, Tuple[float, float]] = {}
+        # Short-lived order books: token_id -> (monotonic ts, (bids, asks))
+        self._book_cache: Dict[str, Tuple[float, Tuple[BookSide, BookSide]]] = {}
+        # Last 200 per /events batch: slugs -> (ETag, reduced results)
+        self._event_etags: Dict[tuple, Tuple[str, Dict[str, Tuple[bool, Optional[str]]]]] = {}
+        # Book requests in flight: token_id -> future of (bids, asks)
+        self._book_requests: Dict[str, asyncio.Future] = {}
+        self._fetch_sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+        self.book_stream: Optional[BookStream] = None
+
         # Initialize SDK client if available
         self.sdk_client = None
         if USE_SDK and SDK_AVAILABLE:
             try:
-                self.sdk_client = AsyncPolymarketClient()
+                self.sdk_client = AsyncPolymarketClient(client=self.client)
                 log("SDK client initialized")
             except Exception as e:
                 log(f"SDK init failed, using httpx: {e}")
         log(f"Portfolio: ${self.portfolio['current_balance']:,.2f} balance, "
             f"{len(self.portfolio['positions'])} open positions")
 
+    def _open_db(self) -> sqlite3.Connection:
+        """Open the portfolio database in WAL mode and ensure the schema exists."""
+        path = Path(PAPER_PORTFOLIO_DB)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Debounced saves write from a worker thread; _db_lock serializes access
+        db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(PORTFOLIO_SCHEMA)
+        return db
+
     def _load_portfolio(self) -> dict:
-        """Load portfolio from disk."""
+        """Load counters and open positions from the portfolio database."""
         try:
-            path = Path(PAPER_PORTFOLIO_FILE)
-            if path.exists():
-                with open(path) as f:
-                    return json.load(f)
-        except Exception:
-            pass
+            meta = {key: _loads(value) for key, value in self.db.execute("SELECT key, value FROM meta")}
+            if not meta:
+                return self._import_legacy_portfolio()
+
+            portfolio = self._create_empty_portfolio()
+            portfolio.update(meta)
+            positions = []
+            for row_id, data in self.db.execute("SELECT id, data FROM positions ORDER BY id"):
+                pos = _loads(data)
+                pos["db_id"] = row_id
+                positions.append(pos)
+            portfolio["positions"] = positions
+            return portfolio
+        except Exception as e:
+            log(f"Error loading portfolio: {e}")
         return self._create_empty_portfolio()
 
+    def _import_legacy_portfolio(self) -> dict:
+        """Seed an empty database from the old JSON portfolio file, if present."""
+        portfolio = self._create_empty_portfolio()
+        path = Path(PAPER_PORTFOLIO_FILE)
+        if not path.exists():
+            return portfolio
+
+        legacy = _loads(path.read_bytes())
+        closed = legacy.pop("closed_positions", [])
+        # Backfill display titles for portfolios saved before title_short
+        for pos in legacy.get("positions", []) + closed:
+            if "title_short" not in pos:
+                pos["title_short"] = pos["title"][:TITLE_SHORT_LEN]
+        portfolio.update(legacy)
+
+        log(f"Importing {len(portfolio['positions'])} open / {len(closed)} closed positions from {PAPER_PORTFOLIO_FILE}")
+        self.portfolio = portfolio
+        self._pending_closed = closed
+        self._changed_positions = list(portfolio["positions"])
+        self._save_portfolio()
+        return portfolio
+
     def _create_empty_portfolio(self) -> dict:
         return {
             "starting_balance": self.starting_balance,
             "current_balance": self.starting_balance,
             "positions": [],
-            "closed_positions": [],
             "total_pnl": 0.0,
             "total_trades": 0,
             "wins": 0,
@@ -131,84 +509,212 @@ class PaperTrader:
         }
 
     def _save_portfolio(self):
-        """Save portfolio to disk."""
+        """
+        Persist counters and the positions changed since the last save.
+
+        Runs as a single transaction that touches only new, modified, and
+        closed positions, so cost is independent of portfolio size.
+        """
+        with self._db_lock:
+            self._write_changes(self._snapshot_changes())
+
+    async def _save_portfolio_async(self):
+        """Save without blocking the event loop; rows are serialized before handing off."""
+        await asyncio.to_thread(self._write_changes, self._snapshot_changes())
+
+    def _snapshot_changes(self) -> dict:
+        """Serialize pending changes on the calling thread."""
+        changed = [
+            (pos, pos.get("db_id"), _dumps(pos)) for pos in self._changed_positions if pos["status"] == "open"
+        ]
+        return {
+            "meta": [(key, _dumps(value)) for key, value in self.portfolio.items() if key != "positions"],
+            "closed": [
+                (pos["slug"], pos.get("token_id", ""), pos["status"], pos.get("pnl"), _dumps(pos))
+                for pos in self._pending_closed
+            ],
+            "closed_ids": [(pos["db_id"],) for pos in self._pending_closed if "db_id" in pos],
+            "changed": changed,
+            "n_closed": len(self._pending_closed),
+            "n_changed": len(self._changed_positions),
+        }
+
+    def _write_changes(self, snapshot: dict):
+        """Write a snapshot in one transaction, then drop the entries it covered."""
         try:
-            path = Path(PAPER_PORTFOLIO_FILE)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w") as f:
-                json.dump(self.portfolio, f, indent=2)
+            with self._db_lock, self.db:
+                self.db.execute("BEGIN")
+                self.db.executemany(
+                    "INSERT INTO closed_positions (slug, token_id, status, pnl, data) VALUES (?, ?, ?, ?, ?)",
+                    snapshot["closed"],
+                )
+                self.db.executemany("DELETE FROM positions WHERE id = ?", snapshot["closed_ids"])
+                inserted = []
+                for pos, db_id, data in snapshot["changed"]:
+                    if db_id is not None:
+                        self.db.execute("UPDATE positions SET data = ? WHERE id = ?", (data, db_id))
+                    else:
+                        cursor = self.db.execute(
+                            "INSERT INTO positions (slug, token_id, data) VALUES (?, ?, ?)",
+                            (pos["slug"], pos["token_id"], data),
+                        )
+                        inserted.append((pos, cursor.lastrowid))
+                self.db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", snapshot["meta"])
+                for pos, db_id in inserted:
+                    pos["db_id"] = db_id
+                # Entries queued while the write was in flight stay for the next save
+                del self._pending_closed[:snapshot["n_closed"]]
+                del self._changed_positions[:snapshot["n_changed"]]
         except Exception as e:
             log(f"Error saving portfolio: {e}")
 
+    def _mark_dirty(self):
+        """
+        Flag unsaved changes and schedule a debounced save.
+
+        Outside a running event loop (CLI paths) the save happens immediately.
+        """
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            try:
+                self._save_task = asyncio.get_running_loop().create_task(self._debounced_save())
+            except RuntimeError:
+                self._flush_if_dirty()
+
+    async def _debounced_save(self):
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+        if self._dirty:
+            self._dirty = False
+            await self._save_portfolio_async()
+
+    def _flush_if_dirty(self):
+        if self._dirty:
+            self._dirty = False
+            self._save_portfolio()
+
+    def _record_closed(self, pos: dict):
+        """Queue a closed position for the next save and drop its cached state."""
+        pos["status_label"] = _status_label(pos["status"])
+        self._pending_closed.append(pos)
+        self._open_value -= pos["amount_invested"]
+        self._bid_cache.pop(pos.get("token_id", ""), None)
+        self._book_cache.pop(pos.get("token_id", ""), None)
+        if self.book_stream:
+            self.book_stream.unsubscribe(pos.get("token_id", ""))
+
+    def _remove_positions(self, closed: list):
+        """Drop closed positions from the open list in a single pass."""
+        if closed:
+            closed_ids = {_position_id(pos) for pos in closed}
+            self.portfolio["positions"] = [
+                pos for pos in self.portfolio["positions"] if _position_id(pos) not in closed_ids
+            ]
+
+    def _recent_closed(self, limit: int) -> list:
+        """Last `limit` closed positions, newest first: unsaved closes, then saved rows by id DESC."""
+        # The save worker thread writes (and trims _pending_closed) under the same lock
+        with self._db_lock:
+            recent = self._pending_closed[::-1][:limit]
+            if len(recent) < limit:
+                rows = self.db.execute(
+                    "SELECT data FROM closed_positions ORDER BY id DESC LIMIT ?", (limit - len(recent),)
+                )
+                recent += [_loads(data) for (data,) in rows]
+        return recent
+
     def reset_portfolio(self):
         """Reset portfolio to starting balance."""
-        self.portfolio = self._create_empty_portfolio()
-        self._save_portfolio()
+        with self._db_lock:
+            with self.db:
+                self.db.execute("BEGIN")
+                for table in ("meta", "positions", "closed_positions"):
+                    self.db.execute(f"DELETE FROM {table}")
+            self._pending_closed.clear()
+            self._changed_positions.clear()
+            self.portfolio = self._create_empty_portfolio()
+            self._open_value = 0.0
+            self._save_portfolio()
         log(f"Portfolio reset to ${self.starting_balance:,.2f}")
 
-    async def fetch_order_book(self, token_id: str) -> Tuple[list, list]:
+    async def fetch_order_book(self, token_id: str, use_cache: bool = True) -> Tuple[BookSide, BookSide]:
         """
         Fetch order book from CLOB API (or SDK if available).
 
-        Returns (bids, asks) where each is a list of OrderBookLevel.
+        Returns (bids, asks) as BookSide arrays; bids descending, asks ascending.
         To BUY, we need to walk the ASKS (people selling to us).
+
+        Held tokens are served from the WebSocket book stream when it is
+        running. Other books are reused for BOOK_CACHE_TTL_SECONDS so the
+        checks within one scan cycle share a single fetch; pass
+        use_cache=False to force one.
         """
         if not token_id:
-            return [], []
-
+            return EMPTY_SIDE, EMPTY_SIDE
+
+        now = time.monotonic()
+        if use_cache:
+            if self.book_stream:
+                streamed = self.book_stream.get(token_id)
+                if streamed:
+                    return streamed
+            cached = self._book_cache.get(token_id)
+            if cached and now - cached[0] < BOOK_CACHE_TTL_SECONDS:
+                return cached[1]
+
+            # Checks running side by side share one request per token
+            request = self._book_requests.get(token_id)
+            if request is None:
+                request = asyncio.ensure_future(self._request_order_book(token_id))
+                self._book_requests[token_id] = request
+                request.add_done_callback(lambda _: self._book_requests.pop(token_id, None))
+            bids, asks = await asyncio.shield(request)
+        else:
+            bids, asks = await self._request_order_book(token_id)
+        if bids or asks:
+            if self.book_stream:
+                self.book_stream.seed(token_id, bids, asks)
+            if len(self._book_cache) >= BOOK_CACHE_MAX_ENTRIES:
+                self._book_cache = {
+                    tid: entry for tid, entry in self._book_cache.items()
+                    if now - entry[0] < BOOK_CACHE_TTL_SECONDS
+                }
+            self._book_cache[token_id] = (now, (bids, asks))
+        return bids, asks
+
+    async def _request_order_book(self, token_id: str) -> Tuple[BookSide, BookSide]:
+        """Fetch a fresh order book from the SDK, falling back to raw httpx."""
         # Try SDK first if available
         if self.sdk_client:
             try:
                 book = await self.sdk_client.get_order_book(token_id)
                 if book:
-                    bids = [OrderBookLevel(price=l.price, size=l.size) for l in book.bids]
-                    asks = [OrderBookLevel(price=l.price, size=l.size) for l in book.asks]
-                    asks.sort(key=lambda x: x.price)
-                    bids.sort(key=lambda x: x.price, reverse=True)
-                    return bids, asks
+                    return BookSide(book.bid_px, book.bid_sz), BookSide(book.ask_px, book.ask_sz)
             except Exception as e:
                 log(f"SDK order book failed, falling back to httpx: {e}")
 
         # Fallback to raw httpx
         try:
-            url = f"{CLOB_API_BASE}/book?token_id={token_id}"
-            resp = await self.client.get(url)
+            resp = await self.client.get(CLOB_BOOK_URL, params={"token_id": token_id})
             if resp.status_code != 200:
-                return [], []
+                return EMPTY_SIDE, EMPTY_SIDE
 
-            data = resp.json()
-
-            bids = []
-            for level in data.get("bids", []):
-                bids.append(OrderBookLevel(
-                    price=float(level.get("price", 0)),
-                    size=float(level.get("size", 0))
-                ))
-
-            asks = []
-            for level in data.get("asks", []):
-                asks.append(OrderBookLevel(
-                    price=float(level.get("price", 0)),
-                    size=float(level.get("size", 0))
-                ))
-
-            # Sort asks by price ascending (cheapest first)
-            asks.sort(key=lambda x: x.price)
-            # Sort bids by price descending (highest first)
-            bids.sort(key=lambda x: x.price, reverse=True)
+            data = _loads(resp.content)
 
+            # Bids descending (highest first), asks ascending (cheapest first)
+            bids = BookSide.from_json(data.get("bids") or [], descending=True)
+            asks = BookSide.from_json(data.get("asks") or [])
             return bids, asks
 
         except Exception as e:
             log(f"Error fetching order book: {e}")
-            return [], []
+            return EMPTY_SIDE, EMPTY_SIDE
 
-    def simulate_buy(self, asks: list, max_spend: float) -> Optional[FillResult]:
+    def simulate_buy(self, asks: BookSide, max_spend: float) -> Optional[FillResult]:
         """
         Simulate buying by walking the ask side of the book.
 
         Args:
-            asks: List of OrderBookLevel, sorted by price ascending
+            asks: Ask side, sorted by price ascending
             max_spend: Maximum USD to spend
 
         Returns:
@@ -217,8 +723,22 @@ class PaperTrader:
         if not asks:
             return None
 
+        # Fast path: the top level alone covers the spend even after the depth cap
+        best_price = asks.best_price
+        level0_cost = best_price * float(asks.sizes[0])
+        if (level0_cost * MAX_BOOK_DEPTH_PCT >= max_spend >= MIN_POSITION_USD
+                and level0_cost >= MIN_LIQUIDITY_USD):
+            return FillResult(
+                shares_filled=max_spend / best_price,
+                avg_price=best_price,
+                total_cost=max_spend,
+                slippage_pct=0.0,
+                book_depth_used_pct=max_spend / asks.notional() * 100,
+            )
+
         # Calculate total available liquidity
-        total_liquidity = sum(level.price * level.size for level in asks)
+        cum_cost = np.cumsum(asks.prices * asks.sizes)
+        total_liquidity = float(cum_cost[-1])
 
         if total_liquidity < MIN_LIQUIDITY_USD:
             return None
@@ -229,30 +749,15 @@ class PaperTrader:
         if max_spend < MIN_POSITION_USD:
             return None
 
-        # Walk the book
-        total_cost = 0.0
-        total_shares = 0.0
-        best_price = asks[0].price if asks else 0
+        # Levels [0, k) are bought whole; level k (if any) takes the remaining spend
+        k = int(np.searchsorted(cum_cost, max_spend, side="right"))
+        total_cost = float(cum_cost[k - 1]) if k > 0 else 0.0
+        total_shares = float(asks.sizes[:k].sum())
 
-        remaining_spend = max_spend
-
-        for level in asks:
-            if remaining_spend <= 0:
-                break
-
-            level_cost = level.price * level.size
-
-            if level_cost <= remaining_spend:
-                # Take entire level
-                total_cost += level_cost
-                total_shares += level.size
-                remaining_spend -= level_cost
-            else:
-                # Partial fill at this level
-                shares_at_level = remaining_spend / level.price
-                total_cost += remaining_spend
-                total_shares += shares_at_level
-                remaining_spend = 0
+        if k < len(asks):
+            remaining_spend = max_spend - total_cost
+            total_cost += remaining_spend
+            total_shares += remaining_spend / float(asks.prices[k])
 
         if total_shares <= 0:
             return None
@@ -269,12 +774,12 @@ class PaperTrader:
             book_depth_used_pct=book_depth_used,
         )
 
-    def simulate_sell(self, bids: list, shares_to_sell: float) -> Optional[FillResult]:
+    def simulate_sell(self, bids: BookSide, shares_to_sell: float) -> Optional[FillResult]:
         """
         Simulate selling by walking the bid side of the book.
 
         Args:
-            bids: List of OrderBookLevel, sorted by price descending
+            bids: Bid side, sorted by price descending
             shares_to_sell: Number of shares to sell
 
         Returns:
@@ -283,27 +788,19 @@ class PaperTrader:
         if not bids or shares_to_sell <= 0:
             return None
 
-        # Walk the book
-        total_proceeds = 0.0
-        total_shares_sold = 0.0
-        best_price = bids[0].price if bids else 0
+        prices, sizes = bids.prices, bids.sizes
+        cum_shares = np.cumsum(sizes)
+        best_price = bids.best_price
 
-        remaining_shares = shares_to_sell
+        # Levels [0, idx) are taken whole; level idx (if any) is partially filled
+        idx = int(np.searchsorted(cum_shares, shares_to_sell, side="right"))
+        total_proceeds = float(np.dot(prices[:idx], sizes[:idx]))
+        total_shares_sold = float(cum_shares[idx - 1]) if idx > 0 else 0.0
 
-        for level in bids:
-            if remaining_shares <= 0:
-                break
-
-            if level.size <= remaining_shares:
-                # Take entire level
-                total_proceeds += level.price * level.size
-                total_shares_sold += level.size
-                remaining_shares -= level.size
-            else:
-                # Partial fill at this level
-                total_proceeds += level.price * remaining_shares
-                total_shares_sold += remaining_shares
-                remaining_shares = 0
+        if idx < len(bids):
+            remaining_shares = shares_to_sell - total_shares_sold
+            total_proceeds += float(prices[idx]) * remaining_shares
+            total_shares_sold += remaining_shares
 
         if total_shares_sold <= 0:
             return None
@@ -334,36 +831,40 @@ class PaperTrader:
             return False, 0.0, 0.0
 
         # Calculate total bid liquidity (what we could sell into)
-        total_bid_liquidity = sum(level.price * level.size for level in bids)
-        best_bid = bids[0].price if bids else 0.0
+        total_bid_liquidity = bids.notional()
+        best_bid = bids.best_price
 
         # Need at least MIN_EXIT_LIQUIDITY_USD in bids to consider exiting later
         can_exit = total_bid_liquidity >= MIN_EXIT_LIQUIDITY_USD
 
         return can_exit, best_bid, total_bid_liquidity
 
+    def can_open(self) -> bool:
+        """True if the balance can fund at least a minimum-size position."""
+        return self.portfolio["current_balance"] * MAX_POSITION_PCT >= MIN_POSITION_USD
+
     async def open_position(self, slug: str, title: str, outcome: str,
-                           token_id: str, target_price: float) -> bool:
+                           token_id: str, target_price: float,
+                           book: Optional[Tuple[BookSide, BookSide]] = None) -> bool:
         """
         Open a new paper position with realistic order book simulation.
 
         HYBRID SNIPER: Checks exit liquidity (bids) before entering.
         Snipers need to be able to SELL when price corrects.
 
+        Pass book=(bids, asks) when it was already fetched to skip the request.
+
         Returns True if position was opened, False if skipped.
-        """
-        # Calculate position size (max 5% of portfolio, capped at $500)
-        max_spend = min(
-            self.portfolio["current_balance"] * MAX_POSITION_PCT,
-            MAX_POSITION_USD
-        )
 
-        if max_spend < MIN_POSITION_USD:
+        Safe to run concurrently: sizing reads the balance after the book
+        fetch, and nothing between that read and the debit awaits.
+        """
+        if not self.can_open():
             log(f"SKIP: Insufficient balance for minimum position")
             return False
 
         # Fetch order book
-        bids, asks = await self.fetch_order_book(token_id)
+        bids, asks = book if book is not None else await self.fetch_order_book(token_id)
 
         if not asks:
             log(f"SKIP: No order book for {outcome}")
@@ -372,14 +873,24 @@ class PaperTrader:
 
         # HYBRID SNIPER: Check exit liquidity (bids) BEFORE entering
         # Need bids to sell into when price corrects
-        total_bid_liquidity = sum(level.price * level.size for level in bids) if bids else 0.0
-        best_bid = bids[0].price if bids else 0.0
+        total_bid_liquidity = bids.notional()
+        best_bid = bids.best_price
 
         if total_bid_liquidity < MIN_EXIT_LIQUIDITY_USD:
             log(f"SKIP: No exit liquidity (${total_bid_liquidity:.0f} < ${MIN_EXIT_LIQUIDITY_USD:.0f}) for {title[:30]}...")
             self.portfolio["skipped_no_exit_liquidity"] = self.portfolio.get("skipped_no_exit_liquidity", 0) + 1
             return False
 
+        # Calculate position size (max 5% of portfolio, capped at $500)
+        max_spend = min(
+            self.portfolio["current_balance"] * MAX_POSITION_PCT,
+            MAX_POSITION_USD
+        )
+
+        if max_spend < MIN_POSITION_USD:
+            log(f"SKIP: Insufficient balance for minimum position")
+            return False
+
         # Simulate the buy
         fill = self.simulate_buy(asks, max_spend)
 
@@ -389,15 +900,21 @@ class PaperTrader:
             return False
 
         # Open the position with hybrid sniper tracking
+        entry_dt = datetime.now()
+        entry_time = entry_dt.isoformat()
         position = {
+            "position_id": f"{token_id}:{entry_time}",
             "slug": slug,
             "title": title[:100],
+            "title_short": title[:TITLE_SHORT_LEN],
             "outcome": outcome,
+            "outcome_key": outcome.lower().strip(),  # Compared against resolved winners
             "token_id": token_id,
             "entry_price": fill.avg_price,
             "shares": fill.shares_filled,
             "amount_invested": fill.total_cost,
-            "entry_time": datetime.now().isoformat(),
+            "entry_time": entry_time,
+            "entry_ts": entry_dt.timestamp(),
             "slippage_pct": fill.slippage_pct,
             "status": "open",
             "exit_price": None,
@@ -408,14 +925,32 @@ class PaperTrader:
         }
 
         self.portfolio["positions"].append(position)
+        self._changed_positions.append(position)
         self.portfolio["current_balance"] -= fill.total_cost
+        self._open_value += fill.total_cost
         self.portfolio["total_trades"] += 1
-        self._save_portfolio()
+        self._book_cache.pop(token_id, None)
+        if self.book_stream:
+            self.book_stream.subscribe([token_id])
+        self._mark_dirty()
 
         log(f"OPENED: {fill.shares_filled:.1f} {outcome} @ ${fill.avg_price:.4f}")
         log(f"  Cost: ${fill.total_cost:.2f} | Slippage: {fill.slippage_pct:.2f}% | Exit liq: ${total_bid_liquidity:.0f}")
         return True
 
+    async def _fetch_books(self, token_ids: list) -> list:
+        """
+        Fetch order books concurrently, bounded by MAX_CONCURRENT_FETCHES.
+
+        Returns (bids, asks) per token in input order; failures yield empty sides.
+        """
+        async def fetch(token_id):
+            async with self._fetch_sem:
+                return await self.fetch_order_book(token_id)
+
+        results = await asyncio.gather(*(fetch(tid) for tid in token_ids), return_exceptions=True)
+        return [result if isinstance(result, tuple) else (EMPTY_SIDE, EMPTY_SIDE) for result in results]
+
     async def check_profit_taking(self) -> list:
         """
         HYBRID SNIPER: Check open positions for profit-taking opportunities.
@@ -428,23 +963,41 @@ class PaperTrader:
         All profit-taking exits are tracked as "flips" (not resolutions).
         """
         profit_taken = []
-        positions_copy = self.portfolio["positions"][:]
+        closed = []
+        hot_mult = TAKE_PROFIT_MULT * POLL_HOT_PROXIMITY
+
+        to_fetch = []
+        now = time.monotonic()
+        for pos in self.portfolio["positions"]:
+            token_id = pos.get("token_id", "")
+            if not token_id:
+                continue
 
-        for pos in positions_copy:
-            try:
-                token_id = pos.get("token_id", "")
-                if not token_id:
+            # Skip the book fetch while the last bid couldn't have drifted up to
+            # the lowest exit threshold since it was seen
+            cached = self._bid_cache.get(token_id)
+            if cached and pos["entry_price"] > 0:
+                age = now - cached[1]
+                last_mult = cached[0] / pos["entry_price"]
+                reachable = last_mult * MAX_BID_DRIFT_PER_MIN ** (age / 60)
+                if age < BID_CACHE_MAX_AGE_SECONDS and last_mult < hot_mult and reachable < TAKE_PROFIT_MULT:
                     continue
+            to_fetch.append(pos)
 
-                # Get current order book
-                bids, asks = await self.fetch_order_book(token_id)
+        # Fetch all books concurrently, then apply exit rules one position at a time
+        books = await self._fetch_books([pos["token_id"] for pos in to_fetch])
 
-                if not bids:
+        for pos, (bids, asks) in zip(to_fetch, books):
+            try:
+                token_id = pos["token_id"]
+                # Skip if missing a book, or if a concurrent check closed it during the fetch
+                if not bids or pos["status"] != "open":
                     continue
 
                 # Current best bid is what we could sell at
-                current_bid = bids[0].price if bids else 0
+                current_bid = bids.best_price
                 entry_price = pos["entry_price"]
+                self._bid_cache[token_id] = (current_bid, time.monotonic())
 
                 if entry_price <= 0 or current_bid <= 0:
                     continue
@@ -460,7 +1013,7 @@ class PaperTrader:
 
                     pnl = fill.total_cost - pos["amount_invested"]
 
-                    log(f"FLIP 3x+: {pos['title'][:30]}...")
+                    log(f"FLIP 3x+: {pos['title_short']}...")
                     log(f"  Sold {fill.shares_filled:.1f} @ ${fill.avg_price:.4f} | P&L: ${pnl:+.2f}")
 
                     pos["status"] = "flip_3x"
@@ -471,8 +1024,8 @@ class PaperTrader:
                     self.portfolio["total_pnl"] += pnl
                     self.portfolio["flips"] = self.portfolio.get("flips", 0) + 1
                     self.portfolio["flip_pnl"] = self.portfolio.get("flip_pnl", 0.0) + pnl
-                    self.portfolio["closed_positions"].append(pos)
-                    self.portfolio["positions"].remove(pos)
+                    self._record_closed(pos)
+                    closed.append(pos)
 
                     profit_taken.append({"pos": pos, "type": "flip_3x", "mult": price_mult})
 
@@ -487,13 +1040,16 @@ class PaperTrader:
                     half_invested = pos["amount_invested"] / 2
                     pnl = fill.total_cost - half_invested
 
-                    log(f"FLIP 2x (partial): {pos['title'][:30]}...")
+                    log(f"FLIP 2x (partial): {pos['title_short']}...")
                     log(f"  Sold {fill.shares_filled:.1f} @ ${fill.avg_price:.4f} | P&L: ${pnl:+.2f}")
 
                     # Update position to reflect half sold
                     pos["shares"] -= fill.shares_filled
                     pos["amount_invested"] = half_invested
+                    self._open_value -= half_invested
                     pos["partial_profit_taken"] = True
+                    self._changed_positions.append(pos)
+                    self._book_cache.pop(token_id, None)
 
                     self.portfolio["current_balance"] += fill.total_cost
                     self.portfolio["total_pnl"] += pnl
@@ -510,7 +1066,7 @@ class PaperTrader:
 
                     pnl = fill.total_cost - pos["amount_invested"]
 
-                    log(f"QUICK FLIP 1.5x: {pos['title'][:30]}...")
+                    log(f"QUICK FLIP 1.5x: {pos['title_short']}...")
                     log(f"  Sold {fill.shares_filled:.1f} @ ${fill.avg_price:.4f} | P&L: ${pnl:+.2f}")
 
                     pos["status"] = "flip_1.5x"
@@ -521,19 +1077,34 @@ class PaperTrader:
                     self.portfolio["total_pnl"] += pnl
                     self.portfolio["flips"] = self.portfolio.get("flips", 0) + 1
                     self.portfolio["flip_pnl"] = self.portfolio.get("flip_pnl", 0.0) + pnl
-                    self.portfolio["closed_positions"].append(pos)
-                    self.portfolio["positions"].remove(pos)
+                    self._record_closed(pos)
+                    closed.append(pos)
 
                     profit_taken.append({"pos": pos, "type": "flip_1.5x", "mult": price_mult})
 
             except Exception as e:
                 continue
 
+        self._remove_positions(closed)
         if profit_taken:
-            self._save_portfolio()
+            self._mark_dirty()
 
         return profit_taken
 
+    async def check_open_positions(self) -> Tuple[list, list, list]:
+        """
+        Run every exit check over the open positions in one concurrent pass.
+
+        Returns (profit_taken, cuts, resolved). Each check applies its changes
+        after its own fetches complete and skips positions another one closed.
+        """
+        profit_taken, cuts, resolved = await asyncio.gather(
+            self.check_profit_taking(),  # Flips
+            self.check_time_based_exits(),  # Cut losses after 24h if down 50%+
+            self.check_resolutions(),  # Held to resolution
+        )
+        return profit_taken, cuts, resolved
+
     async def check_resolutions(self) -> list:
         """
         HYBRID SNIPER: Check if any open positions have resolved.
@@ -542,66 +1113,121 @@ class PaperTrader:
         and went to resolution. Tracked separately from flips.
         """
         resolved = []
-        positions_copy = self.portfolio["positions"][:]
+        # No copy needed: removals rebind the list and positions opened during the
+        # fetch have no result, so iterating this reference afterwards is safe
+        positions = self.portfolio["positions"]
+        results = await self._fetch_resolutions([pos["slug"] for pos in positions])
 
-        for pos in positions_copy:
+        for pos in positions:
             try:
-                url = f"{GAMMA_API_BASE}/events?slug={pos['slug']}"
-                resp = await self.client.get(url)
-                if resp.status_code != 200:
+                result = results.get(pos["slug"])
+                # Skip if unknown, or if a concurrent check closed it during the fetch
+                if not result or pos["status"] != "open":
                     continue
-
-                events = resp.json()
-                if not events:
+                closed, winner = result
+                # Market closed - winner is already normalized per event
+                if not closed or not winner:
                     continue
 
-                event = events[0]
-                if not event.get("closed"):
-                    continue
+                won = (pos.get("outcome_key") or pos["outcome"].lower().strip()) == winner
 
-                # Market closed - determine winner
-                for market in event.get("markets", []):
-                    winner = market.get("winner")
-                    if winner:
-                        # Normalize comparison
-                        our_outcome = pos["outcome"].lower().strip()
-                        winning_outcome = winner.lower().strip()
-                        won = (our_outcome == winning_outcome)
-
-                        if won:
-                            payout = pos["shares"] * 1.0
-                            pnl = payout - pos["amount_invested"]
-                            self.portfolio["wins"] += 1
-                            log(f"RESOLUTION WON: {pos['title'][:30]}... P&L: +${pnl:.2f}")
-                        else:
-                            payout = 0
-                            pnl = -pos["amount_invested"]
-                            self.portfolio["losses"] += 1
-                            log(f"RESOLUTION LOST: {pos['title'][:30]}... P&L: -${pos['amount_invested']:.2f}")
-
-                        pos["status"] = "resolution_won" if won else "resolution_lost"
-                        pos["exit_price"] = 1.0 if won else 0.0
-                        pos["pnl"] = pnl
-
-                        self.portfolio["current_balance"] += payout
-                        self.portfolio["total_pnl"] += pnl
-                        # Track as resolution (distinct from flips)
-                        self.portfolio["resolutions"] = self.portfolio.get("resolutions", 0) + 1
-                        self.portfolio["resolution_pnl"] = self.portfolio.get("resolution_pnl", 0.0) + pnl
-                        self.portfolio["closed_positions"].append(pos)
-                        self.portfolio["positions"].remove(pos)
-
-                        resolved.append(pos)
-                        break
+                if won:
+                    payout = pos["shares"] * 1.0
+                    pnl = payout - pos["amount_invested"]
+                    self.portfolio["wins"] += 1
+                    log(f"RESOLUTION WON: {pos['title_short']}... P&L: +${pnl:.2f}")
+                else:
+                    payout = 0
+                    pnl = -pos["amount_invested"]
+                    self.portfolio["losses"] += 1
+                    log(f"RESOLUTION LOST: {pos['title_short']}... P&L: -${pos['amount_invested']:.2f}")
+
+                pos["status"] = "resolution_won" if won else "resolution_lost"
+                pos["exit_price"] = 1.0 if won else 0.0
+                pos["pnl"] = pnl
+
+                self.portfolio["current_balance"] += payout
+                self.portfolio["total_pnl"] += pnl
+                # Track as resolution (distinct from flips)
+                self.portfolio["resolutions"] = self.portfolio.get("resolutions", 0) + 1
+                self.portfolio["resolution_pnl"] = self.portfolio.get("resolution_pnl", 0.0) + pnl
+                self._record_closed(pos)
+
+                resolved.append(pos)
 
             except Exception as e:
                 continue
 
+        self._remove_positions(resolved)
         if resolved:
-            self._save_portfolio()
+            self._mark_dirty()
 
         return resolved
 
+    async def _fetch_resolutions(self, slugs: list) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """
+        Look up (closed, winner) for many slugs with batched /events requests.
+
+        Gamma accepts repeated slug params; any slug missing from the batched
+        responses is retried with a single-slug request.
+        """
+        unique = list(dict.fromkeys(slugs))
+        batches = [unique[i:i + GAMMA_SLUG_BATCH] for i in range(0, len(unique), GAMMA_SLUG_BATCH)]
+        # Forget validators for batches that no longer exist
+        current = {tuple(batch) for batch in batches}
+        self._event_etags = {key: entry for key, entry in self._event_etags.items() if key in current}
+        results: Dict[str, Tuple[bool, Optional[str]]] = {}
+        for batch in await asyncio.gather(*(self._fetch_event_batch(b) for b in batches), return_exceptions=True):
+            if isinstance(batch, dict):
+                results.update(batch)
+
+        missing = [slug for slug in unique if slug not in results]
+        if missing:
+            singles = await asyncio.gather(*(self._fetch_resolution(slug) for slug in missing), return_exceptions=True)
+            for slug, result in zip(missing, singles):
+                if isinstance(result, tuple):
+                    results[slug] = result
+        return results
+
+    async def _fetch_event_batch(self, slugs: list) -> Dict[str, Tuple[bool, Optional[str]]]:
+        """
+        Fetch several events in one request, keyed by slug.
+
+        Revalidates with If-None-Match when the same batch returned an ETag,
+        so unchanged events come back as a bodiless 304.
+        """
+        key = tuple(slugs)
+        cached = self._event_etags.get(key)
+        async with self._fetch_sem:
+            resp = await self.client.get(
+                GAMMA_EVENTS_URL,
+                params=[("slug", slug) for slug in slugs],
+                headers={"If-None-Match": cached[0]} if cached else None,
+                timeout=GAMMA_TIMEOUT,
+            )
+        if resp.status_code == 304 and cached:
+            return cached[1]
+        if resp.status_code != 200:
+            return {}
+        results = {event.get("slug"): _resolution_fields(event) for event in _loads(resp.content)}
+        etag = resp.headers.get("ETag")
+        if etag:
+            self._event_etags[key] = (etag, results)
+        return results
+
+    async def _fetch_resolution(self, slug: str) -> Optional[Tuple[bool, Optional[str]]]:
+        """Fetch one event from Gamma and reduce it to (closed, winner)."""
+        async with self._fetch_sem:
+            resp = await self.client.get(GAMMA_EVENTS_URL, params={"slug": slug}, timeout=GAMMA_TIMEOUT)
+        if resp.status_code != 200:
+            return None
+
+        # Keep only the fields resolution needs; the raw payload is dropped here
+        events = _loads(resp.content)
+        if not events:
+            return None
+        return _resolution_fields(events[0])
+
     async def check_time_based_exits(self) -> list:
         """
         HYBRID SNIPER: Time-based exit logic.
@@ -612,28 +1238,36 @@ class PaperTrader:
         Returns list of positions that were cut.
         """
         cuts = []
-        now = datetime.now()
-        positions_copy = self.portfolio["positions"][:]
-
-        for pos in positions_copy:
-            try:
-                entry_time = datetime.fromisoformat(pos["entry_time"])
-                hours_held = (now - entry_time).total_seconds() / 3600
-
-                # Only check positions held more than CUT_LOSS_HOURS
-                if hours_held < CUT_LOSS_HOURS:
+        now = time.time()
+
+        due = []
+        for pos in self.portfolio["positions"]:
+            entry_ts = pos.get("entry_ts")
+            if entry_ts is None:
+                # Positions opened before entry_ts: parse once and persist
+                try:
+                    entry_ts = pos["entry_ts"] = datetime.fromisoformat(pos["entry_time"]).timestamp()
+                except Exception:
                     continue
+                self._changed_positions.append(pos)
+                self._mark_dirty()
+            hours_held = (now - entry_ts) / 3600
 
-                # Get current bid price
-                token_id = pos.get("token_id", "")
-                if not token_id:
-                    continue
+            # Only check positions held more than CUT_LOSS_HOURS
+            if hours_held < CUT_LOSS_HOURS or not pos.get("token_id"):
+                continue
+            due.append((pos, hours_held))
 
-                bids, _ = await self.fetch_order_book(token_id)
-                if not bids:
+        # Fetch all books concurrently, then apply cut rules one position at a time
+        books = await self._fetch_books([pos["token_id"] for pos, _ in due])
+
+        for (pos, hours_held), (bids, _) in zip(due, books):
+            try:
+                # Skip if missing a book, or if a concurrent check closed it during the fetch
+                if not bids or pos["status"] != "open":
                     continue
 
-                current_bid = bids[0].price
+                current_bid = bids.best_price
                 entry_price = pos["entry_price"]
 
                 if entry_price <= 0:
@@ -650,7 +1284,7 @@ class PaperTrader:
 
                     pnl = fill.total_cost - pos["amount_invested"]
 
-                    log(f"CUT LOSS: {pos['title'][:30]}... {pnl_pct:.0%} after {hours_held:.0f}h")
+                    log(f"CUT LOSS: {pos['title_short']}... {pnl_pct:.0%} after {hours_held:.0f}h")
                     log(f"  Sold {fill.shares_filled:.1f} @ ${fill.avg_price:.4f} | P&L: ${pnl:+.2f}")
 
                     pos["status"] = "cut_loss"
@@ -661,8 +1295,7 @@ class PaperTrader:
                     self.portfolio["total_pnl"] += pnl
                     self.portfolio["cuts"] = self.portfolio.get("cuts", 0) + 1
                     self.portfolio["cut_pnl"] = self.portfolio.get("cut_pnl", 0.0) + pnl
-                    self.portfolio["closed_positions"].append(pos)
-                    self.portfolio["positions"].remove(pos)
+                    self._record_closed(pos)
 
                     cuts.append(pos)
 
@@ -672,15 +1305,48 @@ class PaperTrader:
             except Exception:
                 continue
 
+        self._remove_positions(cuts)
         if cuts:
-            self._save_portfolio()
+            self._mark_dirty()
 
         return cuts
 
+    def start_book_stream(self):
+        """Stream order books for held positions over the CLOB WebSocket, if available."""
+        if not (USE_BOOK_STREAM and SDK_AVAILABLE):
+            return
+        try:
+            self.book_stream = BookStream()
+            self.book_stream.start([pos["token_id"] for pos in self.portfolio["positions"] if pos.get("token_id")])
+            log(f"Book stream started for {len(self.portfolio['positions'])} held positions")
+        except Exception as e:
+            log(f"Book stream unavailable, polling REST: {e}")
+            self.book_stream = None
+
+    def next_poll_interval(self) -> int:
+        """
+        Seconds to wait before the next scan cycle.
+
+        Polls faster while any position's last seen bid is near the quick-flip
+        threshold, and slower when there are no positions to watch.
+        """
+        positions = self.portfolio["positions"]
+        if not positions:
+            return POLL_IDLE_SECONDS
+
+        hot_mult = TAKE_PROFIT_MULT * POLL_HOT_PROXIMITY
+        for pos in positions:
+            cached = self._bid_cache.get(pos.get("token_id", ""))
+            entry_price = pos["entry_price"]
+            if cached and entry_price > 0 and cached[0] / entry_price >= hot_mult:
+                return POLL_HOT_SECONDS
+
+        return POLL_ACTIVE_SECONDS
+
     def get_summary(self) -> str:
         """Get portfolio summary."""
         p = self.portfolio
-        open_value = sum(pos["amount_invested"] for pos in p["positions"])
+        open_value = self._open_value
         total_trades = p.get("total_trades", 0)
         wins = p.get("wins", 0)
         losses = p.get("losses", 0)
@@ -718,38 +1384,39 @@ Skipped (low liq): {p.get('skipped_low_liquidity', 0)}"""
         ]
 
         if p["positions"]:
-            lines.append("OPEN POSITIONS:")
-            lines.append("-" * 50)
+            lines += ["OPEN POSITIONS:", "-" * 50]
             for pos in p["positions"][:20]:
-                lines.append(f"  {pos['title'][:40]}...")
-                lines.append(f"    {pos['outcome']} @ ${pos['entry_price']:.4f} x {pos['shares']:.1f} = ${pos['amount_invested']:.2f}")
+                lines += [
+                    f"  {pos['title_short']}...",
+                    f"    {pos['outcome']} @ ${pos['entry_price']:.4f} x {pos['shares']:.1f} = ${pos['amount_invested']:.2f}",
+                ]
                 if pos.get('slippage_pct'):
                     lines.append(f"    Slippage: {pos['slippage_pct']:.2f}%")
             if len(p["positions"]) > 20:
                 lines.append(f"  ... and {len(p['positions']) - 20} more")
             lines.append("")
 
-        if p["closed_positions"]:
-            recent = p["closed_positions"][-5:]
-            lines.append("RECENT TRADES:")
-            lines.append("-" * 50)
-            for pos in reversed(recent):
-                if pos["status"] == "won":
-                    status = "WIN"
-                elif pos["status"] == "lost":
-                    status = "LOSS"
-                elif "profit" in pos["status"]:
-                    status = "PROFIT"
-                else:
-                    status = pos["status"].upper()
-                lines.append(f"  [{status}] {pos['title'][:35]}... P&L: ${pos['pnl']:+,.2f}")
+        recent = self._recent_closed(5)
+        if recent:
+            lines += ["RECENT TRADES:", "-" * 50]
+            for pos in recent:
+                status = pos.get("status_label") or _status_label(pos["status"])
+                lines.append(f"  [{status}] {pos['title_short']}... P&L: ${pos['pnl']:+,.2f}")
 
         return "\n".join(lines)
 
     async def close(self):
         """Cleanup."""
+        if self.book_stream:
+            await self.book_stream.stop()
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        # Waits on _db_lock for any save still running in the worker thread
         self._save_portfolio()
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
+        with self._db_lock:
+            self.db.close()
 
 
 async def run_paper_trading():
@@ -759,52 +1426,59 @@ async def run_paper_trading():
     log("  Exit liquidity check | 1.5x/2x/3x flips | 24h loss cuts")
     log("=" * 50)
 
-    trader = PaperTrader(starting_balance=10000.0)
-    monitor = NewMarketMonitor()
+    # One pooled client for both the CLOB/Gamma checks and the market scan
+    client = make_pooled_client()
+    trader = PaperTrader(starting_balance=10000.0, client=client)
+    monitor = NewMarketMonitor(client=client)
+
+    trader.start_book_stream()
 
     log(f"\n{trader.get_detailed_status()}\n")
-    log("Scanning for opportunities every 60 seconds...")
+    log(f"Scanning for opportunities every {POLL_HOT_SECONDS}-{POLL_IDLE_SECONDS} seconds...")
     log("Press Ctrl+C to stop\n")
 
+    loop = asyncio.get_running_loop()
     try:
         while True:
-            # Check for new market opportunities
-            opportunities = await monitor.scan_for_new_markets()
+            cycle_start = loop.time()
+
+            # Scan for new markets while open positions are checked
+            opportunities, (profit_taken, cuts, resolved) = await asyncio.gather(
+                monitor.scan_for_new_markets(),
+                trader.check_open_positions(),
+            )
+            if profit_taken or cuts or resolved:
+                log(f"\n{trader.get_summary()}\n")
 
-            for opp in opportunities:
-                if opp.mispricing_score >= 0.3:
+            # Filter first; skip everything if the balance can't fund a minimum position
+            candidates = [opp for opp in opportunities if opp.mispricing_score >= 0.3]
+            if candidates and not trader.can_open():
+                log(f"SKIP {len(candidates)} opportunities: insufficient balance")
+                candidates = []
+
+            if candidates:
+                # Fetch every candidate's book concurrently, then open one at a time
+                books = await trader._fetch_books([opp.token_id for opp in candidates])
+                opened = False
+                for opp, book in zip(candidates, books):
                     log(f"\nOPPORTUNITY: {opp.title[:50]}...")
                     log(f"  {opp.cheap_outcome_name} @ ${opp.prices[opp.cheap_outcome_idx]:.4f}")
                     log(f"  Score: {opp.mispricing_score:.0%} | Token: {opp.token_id[:20]}...")
 
                     # Open paper position with exit liquidity checking
-                    success = await trader.open_position(
+                    opened |= await trader.open_position(
                         slug=opp.slug,
                         title=opp.title,
                         outcome=opp.cheap_outcome_name,
                         token_id=opp.token_id,
                         target_price=opp.prices[opp.cheap_outcome_idx],
+                        book=book,
                     )
+                if opened:
+                    log(f"\n{trader.get_summary()}\n")
 
-                    if success:
-                        log(f"\n{trader.get_summary()}\n")
-
-            # Check for profit-taking opportunities (flips)
-            profit_taken = await trader.check_profit_taking()
-            if profit_taken:
-                log(f"\n{trader.get_summary()}\n")
-
-            # Check for time-based exits (cut losses after 24h if down 50%+)
-            cuts = await trader.check_time_based_exits()
-            if cuts:
-                log(f"\n{trader.get_summary()}\n")
-
-            # Check for resolved positions (held to resolution)
-            resolved = await trader.check_resolutions()
-            if resolved:
-                log(f"\n{trader.get_summary()}\n")
-
-            await asyncio.sleep(60)
+            # Sleep to a deadline so the cycle period doesn't drift by the work time
+            await asyncio.sleep(max(0.0, cycle_start + trader.next_poll_interval() - loop.time()))
 
     except KeyboardInterrupt:
         log("\nStopping...")
@@ -812,6 +1486,7 @@ async def run_paper_trading():
         log(f"\n{trader.get_detailed_status()}")
         await trader.close()
         await monitor.close()
+        await client.aclose()
 
 
 def main():
@@ -849,7 +1524,10 @@ def main():
         return
 
     # Run interactive paper trading
-    asyncio.run(run_paper_trading())
+    if UVLOOP_AVAILABLE:
+        uvloop.run(run_paper_trading())
+    else:
+        asyncio.run(run_paper_trading())
 
 
 if __name__ == "__main__":
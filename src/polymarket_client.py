@@ -7,39 +7,280 @@ Provides real-time market data via websockets and SDK integration.
 import json
 import asyncio
 import threading
-from dataclasses import dataclass
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Callable, Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Tuple
 from queue import Queue
 
+import httpx
+import numpy as np
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import BookParams
 import websocket
 
+# Try to import orjson (optional, falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); fall back to HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Try to import websockets (optional, enables AsyncMarketWebSocket)
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+# Try to import numba (optional, book_stats falls back to plain NumPy)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # API endpoints
 CLOB_HOST = "https://clob.polymarket.com"
 WS_MARKET_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+TIME_OFFSET_TTL = 30  # Seconds a measured server clock offset is reused
+PRICE_CACHE_TTL = 0.2  # Seconds a midpoint/price/last-trade answer is reused per token
+WS_SUBSCRIBE_CHUNK = 200  # Token ids per subscribe/unsubscribe frame
+WS_SUBSCRIBE_COALESCE_SECONDS = 0.02  # AsyncMarketWebSocket batches (un)subscribes within this window
+REST_TIMEOUT = 10  # Seconds per CLOB REST request made without the SDK
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50, keepalive_expiry=150)
+WS_BAD_FRAME_LOG_SECONDS = 60  # At most one undecodable-frame report per interval
+WS_BUFFER_MAX = 10_000  # Undrained messages kept by a polled AsyncMarketWebSocket (oldest dropped first)
 
 
 def log(msg: str):
     print(f"[PM-CLIENT] {msg}", flush=True)
 
 
-@dataclass
+def _loads(data):
+    """Decode a JSON frame (str or bytes), with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj) -> str:
+    """Encode a JSON text frame, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+def _dumpb(obj) -> bytes:
+    """Encode JSON straight to UTF-8 bytes, with orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+class _BadFrameReporter:
+    """Counts undecodable WebSocket frames; logs the count at most once per interval."""
+
+    __slots__ = ("dropped", "_logged_at")
+
+    def __init__(self):
+        self.dropped = 0  # Undecodable frames since the last report
+        self._logged_at = 0.0  # Monotonic time of the last report
+
+    def report(self, message):
+        self.dropped += 1
+        now = time.monotonic()
+        if now - self._logged_at >= WS_BAD_FRAME_LOG_SECONDS:
+            log(f"Dropped {self.dropped} undecodable WebSocket frame(s), latest: {str(message)[:80]!r}")
+            self.dropped = 0
+            self._logged_at = now
+
+
+def _subscription_frames(encode: Callable, token_ids: List[str], **fields) -> list:
+    """{"assets_ids": ..., **fields} frames of at most WS_SUBSCRIBE_CHUNK tokens each, encoded by `encode`."""
+    return [
+        encode({"assets_ids": token_ids[i:i + WS_SUBSCRIBE_CHUNK], **fields})
+        for i in range(0, len(token_ids), WS_SUBSCRIBE_CHUNK)
+    ]
+
+
+def _cached_price(cache: dict, key: tuple) -> Optional[float]:
+    """Price stored under key if younger than PRICE_CACHE_TTL, else None."""
+    hit = cache.get(key)
+    if hit is not None and time.monotonic() - hit[0] < PRICE_CACHE_TTL:
+        return hit[1]
+    return None
+
+
+def _store_price(cache: dict, key: tuple, price: Optional[float]) -> Optional[float]:
+    if price is not None:
+        cache[key] = (time.monotonic(), price)
+    return price
+
+
+@dataclass(slots=True)
 class OrderBookLevel:
     """Single level in the order book."""
     price: float
     size: float
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBook:
-    """Order book snapshot."""
+    """
+    Order book snapshot, one price and one size array per side.
+
+    Sides are ordered best-first: bids descending, asks ascending.
+    """
     token_id: str
-    bids: List[OrderBookLevel]
-    asks: List[OrderBookLevel]
+    bid_px: np.ndarray
+    bid_sz: np.ndarray
+    ask_px: np.ndarray
+    ask_sz: np.ndarray
     timestamp: datetime
+    timestamp_mono: float = field(default_factory=time.monotonic)  # For freshness checks
+
+    @classmethod
+    def from_levels(cls, token_id: str, bids, asks, stamps: Optional[Tuple[datetime, float]] = None) -> "OrderBook":
+        """
+        Build from SDK level objects (.price/.size) or {"price", "size"} dicts.
+
+        Batch callers pass one (datetime, monotonic) pair for every book.
+        """
+        bid_px, bid_sz = _side_arrays(bids, descending=True)
+        ask_px, ask_sz = _side_arrays(asks, descending=False)
+        timestamp, timestamp_mono = stamps or (datetime.now(), time.monotonic())
+        return cls(token_id, bid_px, bid_sz, ask_px, ask_sz, timestamp, timestamp_mono)
+
+    @property
+    def best_bid(self) -> float:
+        return float(self.bid_px[0]) if len(self.bid_px) else 0.0
+
+    @property
+    def best_ask(self) -> float:
+        return float(self.ask_px[0]) if len(self.ask_px) else 0.0
+
+    @property
+    def midpoint(self) -> Optional[float]:
+        if not len(self.bid_px) or not len(self.ask_px):
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def bids(self) -> List[OrderBookLevel]:
+        """Bid levels best-first (rebuilt from the arrays on each access)."""
+        return [OrderBookLevel(p, s) for p, s in zip(self.bid_px.tolist(), self.bid_sz.tolist())]
+
+    @property
+    def asks(self) -> List[OrderBookLevel]:
+        """Ask levels best-first (rebuilt from the arrays on each access)."""
+        return [OrderBookLevel(p, s) for p, s in zip(self.ask_px.tolist(), self.ask_sz.tolist())]
+
+    def vwap(self, depth: int, side: str = "BUY") -> Optional[float]:
+        """Size-weighted price of the best `depth` levels on the side a BUY (asks) or SELL (bids) hits."""
+        px, sz = (self.ask_px, self.ask_sz) if side == "BUY" else (self.bid_px, self.bid_sz)
+        px, sz = px[:depth], sz[:depth]
+        total = sz.sum()
+        if total <= 0:
+            return None
+        return float(np.dot(px, sz) / total)
+
+
+def _side_arrays(levels, descending: bool):
+    """
+    (prices, sizes) float64 arrays for one side, best-first.
+
+    Same ordering contract as paper_trader.BookSide.from_arrays: input may
+    arrive in either direction; a monotonic side is used as-is or reversed,
+    and only an unordered side is sorted.
+    """
+    levels = list(levels)
+    n = len(levels)
+    if n and isinstance(levels[0], dict):
+        # Raw JSON levels carry decimal strings; numpy parses them in C
+        px = np.array([l["price"] for l in levels], dtype=np.float64)
+        sz = np.array([l["size"] for l in levels], dtype=np.float64)
+    else:
+        px = np.fromiter((float(l.price) for l in levels), dtype=np.float64, count=n)
+        sz = np.fromiter((float(l.size) for l in levels), dtype=np.float64, count=n)
+    # CLOB returns each side already ordered (worst-first), so only sort as a fallback
+    steps = np.diff(px)
+    if descending:
+        steps = -steps
+    if np.all(steps >= 0):
+        return px, sz
+    if np.all(steps <= 0):
+        return px[::-1].copy(), sz[::-1].copy()
+    order = np.argsort(-px if descending else px, kind="stable")
+    return px[order], sz[order]
+
+
+def _stack_side(arrays: List[np.ndarray], depth: int, fill: float) -> np.ndarray:
+    """(n, depth) matrix of each array's first `depth` entries, padded with `fill`."""
+    out = np.full((len(arrays), depth), fill)
+    for i, arr in enumerate(arrays):
+        top = arr[:depth]
+        out[i, :len(top)] = top
+    return out
+
+
+def _book_stats_numpy(bid_px, bid_sz, ask_px, ask_sz):
+    """Midpoint, spread, bid VWAP, ask VWAP per row of NaN/0-padded best-first sides."""
+    stats = np.empty((bid_px.shape[0], 4))
+    stats[:, 0] = (bid_px[:, 0] + ask_px[:, 0]) / 2
+    stats[:, 1] = ask_px[:, 0] - bid_px[:, 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stats[:, 2] = np.nansum(bid_px * bid_sz, axis=1) / bid_sz.sum(axis=1)
+        stats[:, 3] = np.nansum(ask_px * ask_sz, axis=1) / ask_sz.sum(axis=1)
+    return stats
+
+
+if NUMBA_AVAILABLE:
+    @njit("float64[:, :](float64[:, :], float64[:, :], float64[:, :], float64[:, :])", parallel=True, cache=True)
+    def _book_stats_kernel(bid_px, bid_sz, ask_px, ask_sz):
+        n, depth = bid_px.shape
+        stats = np.empty((n, 4))
+        for i in prange(n):
+            stats[i, 0] = (bid_px[i, 0] + ask_px[i, 0]) / 2
+            stats[i, 1] = ask_px[i, 0] - bid_px[i, 0]
+            bid_num = bid_den = ask_num = ask_den = 0.0
+            for j in range(depth):
+                if bid_sz[i, j] > 0:
+                    bid_num += bid_px[i, j] * bid_sz[i, j]
+                    bid_den += bid_sz[i, j]
+                if ask_sz[i, j] > 0:
+                    ask_num += ask_px[i, j] * ask_sz[i, j]
+                    ask_den += ask_sz[i, j]
+            stats[i, 2] = bid_num / bid_den if bid_den > 0 else np.nan
+            stats[i, 3] = ask_num / ask_den if ask_den > 0 else np.nan
+        return stats
+else:
+    _book_stats_kernel = _book_stats_numpy
+
+
+def book_stats(books: List["OrderBook"], depth: int = 5) -> np.ndarray:
+    """
+    Top-of-book statistics for many books in one pass.
+
+    Returns an (n, 4) array of midpoint, spread, bid VWAP and ask VWAP
+    (over the best `depth` levels) in `books` order; NaN where a side is empty.
+    Compiled and parallel across books when numba is installed.
+    """
+    if not books:
+        return np.empty((0, 4))
+    return _book_stats_kernel(
+        _stack_side([b.bid_px for b in books], depth, np.nan),
+        _stack_side([b.bid_sz for b in books], depth, 0.0),
+        _stack_side([b.ask_px for b in books], depth, np.nan),
+        _stack_side([b.ask_sz for b in books], depth, 0.0),
+    )
 
 
 class PolymarketClient:
@@ -52,32 +293,30 @@ class PolymarketClient:
 
     def __init__(self):
         self.client = ClobClient(CLOB_HOST)
+        # Pooled keep-alive client for the endpoints we call directly as JSON
+        self._http = httpx.Client(http2=HTTP2_AVAILABLE, timeout=REST_TIMEOUT, limits=HTTP_LIMITS)
+        # (token_id, kind) -> (monotonic ts, price) for the price getters
+        self._price_cache: Dict[tuple, Tuple[float, float]] = {}
+        self._time_offset: Optional[Tuple[float, int]] = None  # (monotonic ts, offset ms)
         log("SDK client initialized (read-only mode)")
 
+    def close(self):
+        self._http.close()
+
+    def _get(self, path: str, **params):
+        resp = self._http.get(f"{CLOB_HOST}{path}", params=params)
+        resp.raise_for_status()
+        return _loads(resp.content)
+
     def get_order_book(self, token_id: str) -> Optional[OrderBook]:
         """
-        Fetch order book for a token using the SDK.
+        Fetch order book for a token straight from the CLOB REST API.
 
         Returns OrderBook with bids and asks.
         """
         try:
-            book = self.client.get_order_book(token_id)
-
-            bids = [
-                OrderBookLevel(price=float(level.price), size=float(level.size))
-                for level in book.bids
-            ]
-            asks = [
-                OrderBookLevel(price=float(level.price), size=float(level.size))
-                for level in book.asks
-            ]
-
-            return OrderBook(
-                token_id=token_id,
-                bids=bids,
-                asks=asks,
-                timestamp=datetime.now()
-            )
+            book = self._get("/book", token_id=token_id)
+            return OrderBook.from_levels(token_id, book.get("bids") or [], book.get("asks") or [])
         except Exception as e:
             log(f"Error fetching order book for {token_id[:16]}...: {e}")
             return None
@@ -86,23 +325,18 @@ class PolymarketClient:
         """Fetch multiple order books efficiently."""
         results = {}
         try:
-            params = [BookParams(token_id=tid) for tid in token_ids]
-            books = self.client.get_order_books(params)
-
-            for token_id, book in zip(token_ids, books):
-                bids = [
-                    OrderBookLevel(price=float(level.price), size=float(level.size))
-                    for level in book.bids
-                ]
-                asks = [
-                    OrderBookLevel(price=float(level.price), size=float(level.size))
-                    for level in book.asks
-                ]
-                results[token_id] = OrderBook(
-                    token_id=token_id,
-                    bids=bids,
-                    asks=asks,
-                    timestamp=datetime.now()
+            resp = self._http.post(
+                f"{CLOB_HOST}/books",
+                content=_dumps([{"token_id": tid} for tid in token_ids]),
+                headers={"Content-Type": "application/json"},
+            )
+            resp.raise_for_status()
+
+            stamps = (datetime.now(), time.monotonic())
+            for book in _loads(resp.content):
+                token_id = book.get("asset_id", "")
+                results[token_id] = OrderBook.from_levels(
+                    token_id, book.get("bids") or [], book.get("asks") or [], stamps
                 )
         except Exception as e:
             log(f"Error fetching order books: {e}")
@@ -111,15 +345,25 @@ class PolymarketClient:
 
     def get_midpoint(self, token_id: str) -> Optional[float]:
         """Get midpoint price for a token."""
+        key = (token_id, "mid")
+        cached = _cached_price(self._price_cache, key)
+        if cached is not None:
+            return cached
         try:
-            return float(self.client.get_midpoint(token_id))
+            mid = float(self._get("/midpoint", token_id=token_id)["mid"])
+            return _store_price(self._price_cache, key, mid)
         except Exception:
             return None
 
     def get_price(self, token_id: str, side: str = "BUY") -> Optional[float]:
         """Get best price for a side (BUY or SELL)."""
+        key = (token_id, side)
+        cached = _cached_price(self._price_cache, key)
+        if cached is not None:
+            return cached
         try:
-            return float(self.client.get_price(token_id, side=side))
+            price = float(self._get("/price", token_id=token_id, side=side)["price"])
+            return _store_price(self._price_cache, key, price)
         except Exception:
             return None
 
@@ -138,8 +382,13 @@ class PolymarketClient:
         More accurate than midpoint for fill simulation as it reflects
         actual executed trades.
         """
+        key = (token_id, "last")
+        cached = _cached_price(self._price_cache, key)
+        if cached is not None:
+            return cached
         try:
-            return float(self.client.get_last_trade_price(token_id))
+            price = float(self._get("/last-trade-price", token_id=token_id)["price"])
+            return _store_price(self._price_cache, key, price)
         except Exception:
             return None
 
@@ -160,12 +409,15 @@ class PolymarketClient:
         Calculate time offset between local and server time.
 
         Returns offset in milliseconds (positive = local ahead of server).
+        Reused for TIME_OFFSET_TTL seconds after a successful measurement.
         """
-        import time
-        local_ms = int(time.time() * 1000)
+        if self._time_offset and time.monotonic() - self._time_offset[0] < TIME_OFFSET_TTL:
+            return self._time_offset[1]
+        local_ms = time.time_ns() // 1_000_000
         server_ms = self.get_server_time()
         if server_ms:
-            return local_ms - server_ms
+            self._time_offset = (time.monotonic(), local_ms - server_ms)
+            return self._time_offset[1]
         return 0
 
 
@@ -173,82 +425,104 @@ class MarketWebSocket:
     """
     WebSocket client for real-time market data.
 
-    Subscribes to order book updates for specified tokens.
+    Subscribes to order book updates for specified tokens. Messages go to
+    on_message when given, otherwise to a queue polled with get_message().
+    on_connect / on_disconnect fire around each connection, so consumers
+    holding streamed state can drop it across a gap.
     """
 
-    def __init__(self, on_message: Optional[Callable] = None):
+    def __init__(
+        self,
+        on_message: Optional[Callable] = None,
+        on_connect: Optional[Callable[[], None]] = None,
+        on_disconnect: Optional[Callable[[], None]] = None,
+    ):
         self.ws: Optional[websocket.WebSocketApp] = None
         self.thread: Optional[threading.Thread] = None
         self.subscribed_tokens: set = set()
         self.on_message_callback = on_message
-        self.message_queue: Queue = Queue()
+        self.on_connect_callback = on_connect
+        self.on_disconnect_callback = on_disconnect
+        # Only polled consumers need the queue; with a callback it would just grow
+        self.message_queue: Optional[Queue] = Queue() if on_message is None else None
         self.running = False
         self._reconnect_delay = 1
         self._max_reconnect_delay = 60
+        self._resub_frames: Optional[List[bytes]] = None  # Full-set subscribe frames, reset on (un)subscribe
+        self._bad_frames = _BadFrameReporter()
+        self._stopped = threading.Event()  # Cuts a reconnect backoff short on stop()
 
     def _on_open(self, ws):
         log("WebSocket connected")
         self._reconnect_delay = 1  # Reset on successful connect
+        if self.on_connect_callback:
+            self.on_connect_callback()
 
         # Resubscribe to tokens if any
         if self.subscribed_tokens:
-            self._send_subscribe(list(self.subscribed_tokens))
+            self._resubscribe()
 
     def _on_message(self, ws, message):
         try:
-            data = json.loads(message)
+            data = _loads(message)
+        except ValueError:  # Bad JSON, or malformed UTF-8 in a raw bytes frame
+            self._bad_frames.report(message)
+            return
 
-            # Put in queue for async processing
+        if self.on_message_callback:
+            self.on_message_callback(data)
+        else:
             self.message_queue.put(data)
 
-            # Call callback if provided
-            if self.on_message_callback:
-                self.on_message_callback(data)
-
-        except json.JSONDecodeError:
-            pass
-
     def _on_error(self, ws, error):
         log(f"WebSocket error: {error}")
 
     def _on_close(self, ws, close_status_code, close_msg):
         log(f"WebSocket closed: {close_status_code} - {close_msg}")
 
-        # Reconnect if still running
-        if self.running:
-            log(f"Reconnecting in {self._reconnect_delay}s...")
-            threading.Timer(self._reconnect_delay, self._connect).start()
-            self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
+    def _send_frames(self, frames: List[bytes]):
+        # Frames are pre-encoded UTF-8 JSON, sent as text without another encode
+        if self.ws and self.ws.sock and self.ws.sock.connected:
+            for frame in frames:
+                self.ws.send(frame, opcode=websocket.ABNF.OPCODE_TEXT)
+
+    def _resubscribe(self):
+        """Subscribe the whole token set, reusing frames encoded by an earlier reconnect."""
+        if self._resub_frames is None:
+            self._resub_frames = _subscription_frames(_dumpb, list(self.subscribed_tokens), type="market")
+        self._send_frames(self._resub_frames)
+        log(f"Subscribed to {len(self.subscribed_tokens)} tokens")
 
     def _send_subscribe(self, token_ids: List[str]):
         """Send subscription message."""
         if self.ws and self.ws.sock and self.ws.sock.connected:
-            msg = {
-                "assets_ids": token_ids,
-                "type": "market"
-            }
-            self.ws.send(json.dumps(msg))
+            self._send_frames(_subscription_frames(_dumpb, token_ids, type="market"))
             log(f"Subscribed to {len(token_ids)} tokens")
 
     def _send_unsubscribe(self, token_ids: List[str]):
         """Send unsubscription message."""
-        if self.ws and self.ws.sock and self.ws.sock.connected:
-            msg = {
-                "assets_ids": token_ids,
-                "operation": "unsubscribe"
-            }
-            self.ws.send(json.dumps(msg))
+        self._send_frames(_subscription_frames(_dumpb, token_ids, operation="unsubscribe"))
 
     def _connect(self):
-        """Create and connect WebSocket."""
-        self.ws = websocket.WebSocketApp(
-            WS_MARKET_URL,
-            on_open=self._on_open,
-            on_message=self._on_message,
-            on_error=self._on_error,
-            on_close=self._on_close
-        )
-        self.ws.run_forever(ping_interval=10, ping_timeout=5)
+        """Connect, and reconnect with backoff on this one thread until stopped."""
+        while self.running:
+            self.ws = websocket.WebSocketApp(
+                WS_MARKET_URL,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            # Text frames arrive as raw bytes; _on_message's decode rejects malformed UTF-8 as a bad frame
+            self.ws.run_forever(ping_interval=10, ping_timeout=5, skip_utf8_validation=True)
+            # Closed, failed, or never connected: messages may have been missed
+            if self.on_disconnect_callback:
+                self.on_disconnect_callback()
+
+            if self.running:
+                log(f"Reconnecting in {self._reconnect_delay}s...")
+                self._stopped.wait(self._reconnect_delay)
+                self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
 
     def start(self):
         """Start WebSocket connection in background thread."""
@@ -256,6 +530,7 @@ class MarketWebSocket:
             return
 
         self.running = True
+        self._stopped.clear()
         self.thread = threading.Thread(target=self._connect, daemon=True)
         self.thread.start()
         log("WebSocket thread started")
@@ -263,6 +538,7 @@ class MarketWebSocket:
     def stop(self):
         """Stop WebSocket connection."""
         self.running = False
+        self._stopped.set()
         if self.ws:
             self.ws.close()
         log("WebSocket stopped")
@@ -272,6 +548,7 @@ class MarketWebSocket:
         new_tokens = [t for t in token_ids if t not in self.subscribed_tokens]
         if new_tokens:
             self.subscribed_tokens.update(new_tokens)
+            self._resub_frames = None
             self._send_subscribe(new_tokens)
 
     def unsubscribe(self, token_ids: List[str]):
@@ -279,16 +556,225 @@ class MarketWebSocket:
         tokens_to_remove = [t for t in token_ids if t in self.subscribed_tokens]
         if tokens_to_remove:
             self.subscribed_tokens -= set(tokens_to_remove)
+            self._resub_frames = None
             self._send_unsubscribe(tokens_to_remove)
 
     def get_message(self, timeout: float = 0.1) -> Optional[dict]:
-        """Get next message from queue (non-blocking)."""
+        """Get next message from queue (non-blocking); always None with a callback."""
+        if self.message_queue is None:
+            return None
         try:
             return self.message_queue.get(timeout=timeout)
         except Exception:
             return None
 
 
+class AsyncMarketWebSocket:
+    """
+    asyncio WebSocket client for real-time market data.
+
+    Same surface as MarketWebSocket, but the connection runs as a task on
+    the caller's event loop (start() must be called from inside it), so
+    messages reach on_message without a thread hop. Without a callback they
+    are buffered for a single consumer, which can take them in batches with
+    drain(). stop() is a coroutine that waits for the connection task.
+    Requires the optional websockets package.
+    """
+
+    def __init__(
+        self,
+        on_message: Optional[Callable] = None,
+        on_connect: Optional[Callable[[], None]] = None,
+        on_disconnect: Optional[Callable[[], None]] = None,
+    ):
+        self.ws = None
+        self.task: Optional[asyncio.Task] = None
+        self.subscribed_tokens: set = set()
+        self.on_message_callback = on_message
+        self.on_connect_callback = on_connect
+        self.on_disconnect_callback = on_disconnect
+        self._buf: deque = deque(maxlen=WS_BUFFER_MAX)
+        self._wake: Optional[asyncio.Future] = None  # Set when a message lands in an empty buffer
+        self.running = False
+        self._reconnect_delay = 1
+        self._max_reconnect_delay = 60
+        self._resub_frames: Optional[List[str]] = None  # Full-set subscribe frames, reset on (un)subscribe
+        self._bad_frames = _BadFrameReporter()
+        self._sends: set = set()  # In-flight send tasks (held so they aren't collected)
+        self._pending_sub: set = set()  # Changes waiting for the coalescing window to close
+        self._pending_unsub: set = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def _on_message(self, message):
+        try:
+            data = _loads(message)
+        except ValueError:  # Bad JSON, or malformed UTF-8 in a raw bytes frame
+            self._bad_frames.report(message)
+            return
+
+        if self.on_message_callback:
+            self.on_message_callback(data)
+            return
+
+        self._buf.append(data)
+        if self._wake is not None and not self._wake.done():
+            self._wake.set_result(None)
+
+    async def _run(self):
+        """Connect, pump messages, and reconnect with backoff while running."""
+        while self.running:
+            try:
+                async with websockets.connect(WS_MARKET_URL, ping_interval=10, ping_timeout=5) as ws:
+                    self.ws = ws
+                    log("WebSocket connected")
+                    self._reconnect_delay = 1  # Reset on successful connect
+                    if self.on_connect_callback:
+                        self.on_connect_callback()
+
+                    # Resubscribe to tokens if any
+                    if self.subscribed_tokens:
+                        self._resubscribe()
+
+                    async for message in ws:
+                        self._on_message(message)
+                log("WebSocket closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log(f"WebSocket error: {e}")
+            finally:
+                self.ws = None
+                # A reconnect resubscribes the full set, so drop queued deltas
+                if self._flush_handle is not None:
+                    self._flush_handle.cancel()
+                    self._flush_handle = None
+                self._pending_sub.clear()
+                self._pending_unsub.clear()
+                if self.on_disconnect_callback:
+                    self.on_disconnect_callback()
+
+            if self.running:
+                log(f"Reconnecting in {self._reconnect_delay}s...")
+                await asyncio.sleep(self._reconnect_delay)
+                self._reconnect_delay = min(self._reconnect_delay * 2, self._max_reconnect_delay)
+
+    async def _send_quietly(self, ws, frames: List[str]):
+        try:
+            for frame in frames:
+                await ws.send(frame)
+        except Exception as e:
+            log(f"WebSocket send failed: {e}")
+
+    def _send_frames(self, frames: List[str]):
+        """Queue frames on the open connection (dropped if disconnected; _run resubscribes)."""
+        if self.ws is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._send_quietly(self.ws, frames))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    def _resubscribe(self):
+        """Subscribe the whole token set, reusing frames encoded by an earlier reconnect."""
+        if self._resub_frames is None:
+            self._resub_frames = _subscription_frames(_dumps, list(self.subscribed_tokens), type="market")
+        self._send_frames(self._resub_frames)
+        log(f"Subscribed to {len(self.subscribed_tokens)} tokens")
+
+    def _send_subscribe(self, token_ids: List[str]):
+        """Send subscription message."""
+        if self.ws is not None:
+            self._send_frames(_subscription_frames(_dumps, token_ids, type="market"))
+            log(f"Subscribed to {len(token_ids)} tokens")
+
+    def _send_unsubscribe(self, token_ids: List[str]):
+        """Send unsubscription message."""
+        self._send_frames(_subscription_frames(_dumps, token_ids, operation="unsubscribe"))
+
+    def start(self):
+        """Start the connection task on the running event loop."""
+        if self.running:
+            return
+
+        self.running = True
+        self.task = asyncio.get_running_loop().create_task(self._run())
+        log("WebSocket task started")
+
+    async def stop(self):
+        """Stop the connection task and wait for it to wind down."""
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        log("WebSocket stopped")
+
+    def _schedule_flush(self):
+        """Send pending (un)subscriptions once the coalescing window closes."""
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                WS_SUBSCRIBE_COALESCE_SECONDS, self._flush_subscriptions
+            )
+
+    def _flush_subscriptions(self):
+        self._flush_handle = None
+        if self._pending_sub:
+            self._send_subscribe(list(self._pending_sub))
+        if self._pending_unsub:
+            self._send_unsubscribe(list(self._pending_unsub))
+        self._pending_sub.clear()
+        self._pending_unsub.clear()
+
+    def subscribe(self, token_ids: List[str]):
+        """Subscribe to market updates for tokens (sent in one frame per coalescing window)."""
+        new_tokens = [t for t in token_ids if t not in self.subscribed_tokens]
+        if new_tokens:
+            self.subscribed_tokens.update(new_tokens)
+            self._resub_frames = None
+            if self.ws is None:
+                return  # Sent with the full set on (re)connect
+            self._pending_unsub.difference_update(new_tokens)
+            self._pending_sub.update(new_tokens)
+            self._schedule_flush()
+
+    def unsubscribe(self, token_ids: List[str]):
+        """Unsubscribe from tokens (sent in one frame per coalescing window)."""
+        tokens_to_remove = [t for t in token_ids if t in self.subscribed_tokens]
+        if tokens_to_remove:
+            self.subscribed_tokens -= set(tokens_to_remove)
+            self._resub_frames = None
+            if self.ws is None:
+                return
+            for token in tokens_to_remove:
+                if token in self._pending_sub:
+                    self._pending_sub.discard(token)  # Never reached the server
+                else:
+                    self._pending_unsub.add(token)
+            self._schedule_flush()
+
+    async def _wait_for_message(self):
+        if not self._buf:
+            self._wake = asyncio.get_running_loop().create_future()
+            await self._wake
+
+    async def drain(self) -> List[dict]:
+        """Wait until at least one message is buffered, then take them all."""
+        await self._wait_for_message()
+        batch = list(self._buf)
+        self._buf.clear()
+        return batch
+
+    async def get_message(self, timeout: float = 0.1) -> Optional[dict]:
+        """Get next message from the buffer, or None after timeout."""
+        try:
+            await asyncio.wait_for(self._wait_for_message(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self._buf.popleft()
+
+
 class RealTimeMarketMonitor:
     """
     High-level monitor combining SDK and WebSocket for real-time market tracking.
@@ -302,6 +788,7 @@ class RealTimeMarketMonitor:
         self.ws = MarketWebSocket(on_message=self._handle_ws_message)
         self.order_books: Dict[str, OrderBook] = {}
         self.price_callbacks: List[Callable] = []
+        # Serializes writers only; readers rely on dict get/set being atomic
         self._lock = threading.Lock()
 
     def _handle_ws_message(self, data: dict):
@@ -328,29 +815,15 @@ class RealTimeMarketMonitor:
         if not token_id:
             return
 
-        bids = [
-            OrderBookLevel(price=float(b["price"]), size=float(b["size"]))
-            for b in data.get("bids", [])
-        ]
-        asks = [
-            OrderBookLevel(price=float(a["price"]), size=float(a["size"]))
-            for a in data.get("asks", [])
-        ]
+        book = OrderBook.from_levels(token_id, data.get("bids", []), data.get("asks", []))
 
         with self._lock:
-            self.order_books[token_id] = OrderBook(
-                token_id=token_id,
-                bids=bids,
-                asks=asks,
-                timestamp=datetime.now()
-            )
+            self.order_books[token_id] = book
 
         # Fire callbacks
         for cb in self.price_callbacks:
             try:
-                best_bid = bids[0].price if bids else 0
-                best_ask = asks[0].price if asks else 0
-                cb(token_id, best_bid, best_ask)
+                cb(token_id, book.best_bid, book.best_ask)
             except Exception:
                 pass
 
@@ -368,11 +841,12 @@ class RealTimeMarketMonitor:
             if token_id in self.order_books:
                 book = self.order_books[token_id]
                 # Update best bid/ask
-                if best_bid > 0 and book.bids:
-                    book.bids[0] = OrderBookLevel(price=best_bid, size=book.bids[0].size)
-                if best_ask > 0 and book.asks:
-                    book.asks[0] = OrderBookLevel(price=best_ask, size=book.asks[0].size)
+                if best_bid > 0 and len(book.bid_px):
+                    book.bid_px[0] = best_bid
+                if best_ask > 0 and len(book.ask_px):
+                    book.ask_px[0] = best_ask
                 book.timestamp = datetime.now()
+                book.timestamp_mono = time.monotonic()
 
         # Fire callbacks
         for cb in self.price_callbacks:
@@ -393,13 +867,10 @@ class RealTimeMarketMonitor:
         """
         Get order book - uses cache if available, falls back to SDK.
         """
-        with self._lock:
-            if token_id in self.order_books:
-                cached = self.order_books[token_id]
-                # Use cache if fresh (< 5 seconds old)
-                age = (datetime.now() - cached.timestamp).total_seconds()
-                if age < 5:
-                    return cached
+        cached = self.order_books.get(token_id)
+        # Use cache if fresh (< 5 seconds old)
+        if cached is not None and time.monotonic() - cached.timestamp_mono < 5:
+            return cached
 
         # Fetch via SDK
         book = self.client.get_order_book(token_id)
@@ -419,45 +890,110 @@ class RealTimeMarketMonitor:
 
 # Async wrapper for use with asyncio
 class AsyncPolymarketClient:
-    """Async wrapper around the SDK client."""
+    """
+    Async CLOB REST client.
 
-    def __init__(self):
-        self._client = PolymarketClient()
+    Calls the CLOB endpoints directly on a pooled httpx.AsyncClient, so
+    concurrent requests share one event loop instead of queueing on the
+    default thread pool. Pass `client` to share an existing pool; a client
+    created here is closed by aclose().
+    """
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=REST_TIMEOUT, limits=HTTP_LIMITS)
+        # (token_id, kind) -> (monotonic ts, price) for the price getters
+        self._price_cache: Dict[tuple, Tuple[float, float]] = {}
+        self._time_offset: Optional[Tuple[float, int]] = None  # (monotonic ts, offset ms)
+
+    async def aclose(self):
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def _get(self, path: str, **params):
+        resp = await self.client.get(f"{CLOB_HOST}{path}", params=params or None)
+        resp.raise_for_status()
+        return _loads(resp.content)
 
     async def get_order_book(self, token_id: str) -> Optional[OrderBook]:
         """Async order book fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_order_book, token_id)
+        try:
+            book = await self._get("/book", token_id=token_id)
+            return OrderBook.from_levels(token_id, book.get("bids") or [], book.get("asks") or [])
+        except Exception as e:
+            log(f"Error fetching order book for {token_id[:16]}...: {e}")
+            return None
 
     async def get_order_books(self, token_ids: List[str]) -> Dict[str, OrderBook]:
-        """Async batch order book fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_order_books, token_ids)
+        """Async batch order book fetch (one POST /books for all tokens)."""
+        results = {}
+        try:
+            resp = await self.client.post(
+                f"{CLOB_HOST}/books",
+                content=_dumps([{"token_id": tid} for tid in token_ids]),
+                headers={"Content-Type": "application/json"},
+            )
+            resp.raise_for_status()
+            stamps = (datetime.now(), time.monotonic())
+            for book in _loads(resp.content):
+                token_id = book.get("asset_id", "")
+                results[token_id] = OrderBook.from_levels(
+                    token_id, book.get("bids") or [], book.get("asks") or [], stamps
+                )
+        except Exception as e:
+            log(f"Error fetching order books: {e}")
+
+        return results
 
     async def get_midpoint(self, token_id: str) -> Optional[float]:
         """Async midpoint fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_midpoint, token_id)
+        key = (token_id, "mid")
+        cached = _cached_price(self._price_cache, key)
+        if cached is not None:
+            return cached
+        try:
+            mid = float((await self._get("/midpoint", token_id=token_id))["mid"])
+            return _store_price(self._price_cache, key, mid)
+        except Exception:
+            return None
 
     async def get_markets(self) -> List[dict]:
         """Async markets fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_markets)
+        try:
+            return await self._get("/simplified-markets")
+        except Exception as e:
+            log(f"Error fetching markets: {e}")
+            return []
 
     async def get_last_trade_price(self, token_id: str) -> Optional[float]:
         """Async last trade price fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_last_trade_price, token_id)
+        key = (token_id, "last")
+        cached = _cached_price(self._price_cache, key)
+        if cached is not None:
+            return cached
+        try:
+            price = float((await self._get("/last-trade-price", token_id=token_id))["price"])
+            return _store_price(self._price_cache, key, price)
+        except Exception:
+            return None
 
     async def get_server_time(self) -> Optional[int]:
-        """Async server time fetch."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_server_time)
+        """Async server time fetch (milliseconds)."""
+        try:
+            return int(await self._get("/time"))
+        except Exception:
+            return None
 
     async def get_time_offset(self) -> int:
-        """Async time offset calculation."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._client.get_time_offset)
+        """Async time offset calculation (positive = local ahead of server), cached like the sync one."""
+        if self._time_offset and time.monotonic() - self._time_offset[0] < TIME_OFFSET_TTL:
+            return self._time_offset[1]
+        local_ms = time.time_ns() // 1_000_000
+        server_ms = await self.get_server_time()
+        if server_ms:
+            self._time_offset = (time.monotonic(), local_ms - server_ms)
+            return self._time_offset[1]
+        return 0
 
 
 if __name__ == "__main__":
@@ -475,5 +1011,5 @@ if __name__ == "__main__":
             book = client.get_order_book(token_id)
             if book:
                 print(f"Order book for {token_id[:16]}...")
-                print(f"  Best bid: ${book.bids[0].price if book.bids else 0:.4f}")
-                print(f"  Best ask: ${book.asks[0].price if book.asks else 0:.4f}")
+                print(f"  Best bid: ${book.best_bid:.4f}")
+                print(f"  Best ask: ${book.best_ask:.4f}")
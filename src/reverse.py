@@ -5,13 +5,147 @@ This module analyzes successful wallet trading patterns and reverse-engineers
 their strategies into actionable blueprints that can be replicated.
 """
 
-from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 from datetime import datetime, timedelta
+import io
 import json
 from collections import Counter, defaultdict
-import statistics
+from functools import cached_property, singledispatch
+from itertools import chain
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import math
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+# Try to import numba (optional, arb pairing falls back to plain NumPy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+ARB_PAIR_WINDOW = timedelta(seconds=60)  # YES and NO buys closer than this form one binary arb entry
+# Batch workers never fork: a forked child inherits numba's parallel (TBB) pool state and hangs at exit
+BATCH_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# generate_pseudocode scaffolding (%-formatted once per blueprint / rule)
+_SEP = "=" * 80
+_PSEUDO_HEADER = (
+    _SEP + "\n"
+    "STRATEGY: %s\n"
+    "TYPE: %s\n"
+    "REPLICABILITY: %.1f%%\n"
+    + _SEP + "\n"
+    "\n"
+    "# INITIALIZATION\n"
+    "capital = $%s\n"
+    "expected_trades_per_day = %.0f\n"
+    "expected_win_rate = %.1f%%\n"
+    "\n"
+)
+_PSEUDO_MARKET_SELECTION = (
+    "# MARKET SELECTION\n"
+    "while True:\n"
+    "    markets = get_all_active_markets()\n"
+    "    filtered_markets = []\n"
+    "    for market in markets:\n"
+)
+_PSEUDO_FILTER = "        if %s:  # confidence: %.1f%%\n            filtered_markets.append(market)\n"
+_PSEUDO_RULE = "        %s %s:  # confidence: %.1f%%\n"
+_PSEUDO_ENTRY = (
+    "    # ENTRY LOGIC\n"
+    "    for market in filtered_markets:\n"
+    "        opportunity = analyze_market(market)\n"
+    "        \n"
+)
+_PSEUDO_EXECUTE = (
+    "            \n"
+    "            # Execute trade\n"
+    "            enter_position(market, size)\n"
+    "\n"
+)
+_PSEUDO_EXIT = "    # EXIT LOGIC\n    for position in open_positions:\n"
+
+# Integer codes used by TradeColumns
+SIDE_BUY, SIDE_SELL, SIDE_OTHER = 0, 1, 2
+YES_ID, NO_ID = 0, 1  # Outcome ids are interned per column set, YES/NO always first
+MARKET_BINARY, MARKET_MULTI = 0, 1
+
+
+def _mean(xs) -> float:
+    """Arithmetic mean of a non-empty float sequence (fsum keeps it accurate without statistics' Fraction path)"""
+    return math.fsum(xs) / len(xs)
+
+
+def _pair_costs_numpy(yes_us, yes_px, no_us, no_px, window_us):
+    """
+    Combined YES+NO price of every YES/NO buy pair less than window_us apart.
+
+    Timestamps are int64 microseconds, each side sorted ascending.
+    """
+    lo = np.searchsorted(no_us, yes_us - window_us, side="right")
+    hi = np.searchsorted(no_us, yes_us + window_us, side="left")
+    counts = hi - lo
+    ends = np.cumsum(counts)
+    total = int(ends[-1]) if len(ends) else 0
+    no_idx = np.arange(total) - np.repeat(ends - counts - lo, counts)
+    return np.repeat(yes_px, counts) + no_px[no_idx]
+
+
+if NUMBA_AVAILABLE:
+    @njit("float64[:](int64[:], float64[:], int64[:], float64[:], int64)", cache=True)
+    def _pair_costs_kernel(yes_us, yes_px, no_us, no_px, window_us):
+        # Two-pointer sweep: count the pairs, then fill them in the same order
+        total = 0
+        start = 0
+        for i in range(len(yes_us)):
+            while start < len(no_us) and no_us[start] <= yes_us[i] - window_us:
+                start += 1
+            j = start
+            while j < len(no_us) and no_us[j] < yes_us[i] + window_us:
+                j += 1
+            total += j - start
+        costs = np.empty(total)
+        k = 0
+        start = 0
+        for i in range(len(yes_us)):
+            while start < len(no_us) and no_us[start] <= yes_us[i] - window_us:
+                start += 1
+            j = start
+            while j < len(no_us) and no_us[j] < yes_us[i] + window_us:
+                costs[k] = yes_px[i] + no_px[j]
+                k += 1
+                j += 1
+        return costs
+else:
+    _pair_costs_kernel = _pair_costs_numpy
+
+
+def _max_exposure_numpy(signed_values):
+    """Peak of the running sum of signed values, never below zero"""
+    if not len(signed_values):
+        return 0.0
+    return max(0.0, float(np.cumsum(signed_values).max()))
+
+
+if NUMBA_AVAILABLE:
+    @njit("float64(float64[:])", cache=True)
+    def _max_exposure_kernel(signed_values):
+        current = 0.0
+        peak = 0.0
+        for i in range(len(signed_values)):
+            current += signed_values[i]
+            if current > peak:
+                peak = current
+        return peak
+else:
+    _max_exposure_kernel = _max_exposure_numpy
 
 
 class StrategyType(Enum):
@@ -32,7 +166,7 @@ class RuleType(Enum):
     MARKET_FILTER = "market_filter"
 
 
-@dataclass
+@dataclass(slots=True)
 class Rule:
     """
     A single rule extracted from trading patterns
@@ -96,11 +230,89 @@ class StrategyBlueprint:
     additional_notes: str = ""
 
     def __post_init__(self):
-        if not 0 <= self.replicability_score <= 1:
-            raise ValueError("Replicability score must be between 0 and 1")
+        _check_replicability(self.replicability_score)
 
 
-@dataclass
+def _check_replicability(score: float) -> float:
+    if not 0 <= score <= 1:
+        raise ValueError("Replicability score must be between 0 and 1")
+    return score
+
+
+# StrategyBlueprint fields DeferredBlueprint computes on first access
+_DEFERRED_FIELDS = (
+    "estimated_edge", "capital_required", "replicability_score",
+    "timeframe", "risk_profile", "additional_notes",
+)
+
+
+class DeferredBlueprint(StrategyBlueprint):
+    """
+    StrategyBlueprint whose derived metrics are computed on first access
+
+    Returned by reverse_engineer so callers that only read the rules skip the
+    edge, exposure and notes passes. Each metric is a cached_property computed
+    once; the reverser, trades and analysis are released as soon as every
+    metric has been computed. Pickling computes the rest first, so a pickle
+    holds values only.
+    """
+
+    def __init__(self, reverser: "StrategyReverser", trades: List["Trade"], analysis: "WalletAnalysis", **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+        self._inputs = (reverser, trades, analysis)
+
+    def _compute(self, name: str, fn):
+        reverser, trades, analysis = self._inputs
+        value = self.__dict__[name] = fn(reverser, trades, analysis)
+        if all(field_name in self.__dict__ for field_name in _DEFERRED_FIELDS):
+            self._inputs = None  # Nothing left to compute
+        return value
+
+    @cached_property
+    def estimated_edge(self) -> Dict[str, float]:
+        return self._compute("estimated_edge", lambda r, trades, analysis: r._calculate_edge(trades, analysis))
+
+    @cached_property
+    def capital_required(self) -> float:
+        return self._compute(
+            "capital_required", lambda r, trades, analysis: r._estimate_capital_required(trades, analysis)
+        )
+
+    @cached_property
+    def replicability_score(self) -> float:
+        return self._compute("replicability_score", lambda r, trades, analysis: _check_replicability(
+            r._calculate_replicability(self.entry_rules, self.exit_rules, self.sizing_rules, self.market_filters)
+        ))
+
+    @cached_property
+    def timeframe(self) -> str:
+        return self._compute("timeframe", lambda r, trades, analysis: r._estimate_timeframe(trades, analysis))
+
+    @cached_property
+    def risk_profile(self) -> str:
+        return self._compute(
+            "risk_profile", lambda r, trades, analysis: r._assess_risk_profile(self.strategy_type, trades, analysis)
+        )
+
+    @cached_property
+    def additional_notes(self) -> str:
+        return self._compute(
+            "additional_notes", lambda r, trades, analysis: r._generate_notes(self.strategy_type, trades, analysis)
+        )
+
+    def resolve(self) -> "DeferredBlueprint":
+        """Compute every pending metric (releases the captured inputs)"""
+        for name in _DEFERRED_FIELDS:
+            getattr(self, name)
+        return self
+
+    def __getstate__(self):
+        self.resolve()
+        return self.__dict__
+
+
+@dataclass(slots=True)
 class Trade:
     """
     Simplified trade record for analysis
@@ -116,8 +328,79 @@ class Trade:
     market_type: str = "binary"  # binary or multi
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self):
+        # API/JSON strings are fresh objects; interned ones compare against the
+        # "BUY"/"YES"/"multi" literals by identity
+        if type(self.side) is str:
+            self.side = sys.intern(self.side)
+        if type(self.outcome) is str:
+            self.outcome = sys.intern(self.outcome)
+        if type(self.market_type) is str:
+            self.market_type = sys.intern(self.market_type)
+
+
+@dataclass(slots=True)
+class TradeColumns:
+    """
+    Column-oriented view of a trade list (one array entry per trade, same order)
 
-@dataclass
+    Attributes:
+        ts: int64 microseconds since the first trade
+        price, value, shares: float64 trade fields
+        side: uint8 SIDE_BUY / SIDE_SELL / SIDE_OTHER
+        outcome_id: int32 index into outcomes
+        outcomes: Interned outcome names (YES_ID and NO_ID first)
+        market_id: object array of market IDs
+        market_code: int32 index of each trade's market in market_index
+        market_index: Market ID -> code, in first-seen order
+        market_type: uint8 MARKET_BINARY / MARKET_MULTI
+    """
+    ts: np.ndarray
+    price: np.ndarray
+    value: np.ndarray
+    shares: np.ndarray
+    side: np.ndarray
+    outcome_id: np.ndarray
+    outcomes: List[str]
+    market_id: np.ndarray
+    market_code: np.ndarray
+    market_index: Dict[str, int]
+    market_type: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+@dataclass(slots=True)
+class MarketBuckets:
+    """
+    Trade indices bucketed by market (one shared index array, no per-market lists)
+
+    Attributes:
+        market_index: Market ID -> bucket number (first-seen order)
+        order: Trade indices grouped by bucket, input order kept within each bucket
+        starts, stops: Bucket k is order[starts[k]:stops[k]]
+    """
+    market_index: Dict[str, int]
+    order: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def slice(self, market_id: str) -> Tuple[int, int]:
+        """(start, stop) of a market's bucket within order"""
+        k = self.market_index[market_id]
+        return int(self.starts[k]), int(self.stops[k])
+
+    def trades_for(self, trades: List[Trade], market_id: str) -> List[Trade]:
+        """Materialize one market's trades (in input order)"""
+        start, stop = self.slice(market_id)
+        return [trades[i] for i in self.order[start:stop]]
+
+
+@dataclass(slots=True)
 class WalletProfile:
     """
     Wallet identification and basic stats
@@ -130,7 +413,7 @@ class WalletProfile:
     current_balance: float
 
 
-@dataclass
+@dataclass(slots=True)
 class WalletAnalysis:
     """
     Analyzed patterns from wallet history
@@ -160,6 +443,9 @@ class StrategyReverser:
         """
         self.min_confidence = min_confidence
         self.min_evidence = min_evidence
+        # (trades, grouped) and (trades, columns) for the trade list reverse_engineer is working on
+        self._grouped_cache: Optional[Tuple[List[Trade], Dict[str, List[Trade]]]] = None
+        self._columns_cache: Optional[Tuple[List[Trade], TradeColumns]] = None
 
     def reverse_engineer(
         self,
@@ -178,6 +464,68 @@ class StrategyReverser:
         Returns:
             Complete strategy blueprint
         """
+        # Sort once (stable, so same-instant trades keep their order); every market group
+        # built from this list is then already in time order
+        trades = sorted(trades, key=lambda t: t.timestamp)
+
+        # Every extractor groups by market and scans trade fields; build both once for this call
+        self._grouped_cache = self._columns_cache = None
+        self._grouped_cache = (trades, self._group_trades_by_market(trades))
+        self._columns_cache = (trades, self._columnize(trades))
+        try:
+            return self._build_blueprint(wallet, trades, analysis)
+        finally:
+            self._grouped_cache = self._columns_cache = None
+
+    def reverse_engineer_batch(
+        self,
+        inputs: List[Tuple[WalletProfile, List[Trade], WalletAnalysis]],
+        use_processes: bool = True,
+        max_workers: Optional[int] = None
+    ) -> List[StrategyBlueprint]:
+        """
+        Reverse engineer many wallets in parallel
+
+        Args:
+            inputs: (wallet, trades, analysis) tuples, one per wallet
+            use_processes: Use worker processes (CPU-bound work); threads otherwise.
+                Workers start via forkserver/spawn, so scripts calling this need an
+                `if __name__ == "__main__":` guard.
+                Blueprints pickled back from worker processes arrive with every
+                derived metric computed; thread results stay lazy.
+            max_workers: Worker count (defaults to the CPU count)
+
+        Returns:
+            Blueprints in the same order as inputs
+        """
+        if len(inputs) <= 1:
+            return [self._reverse_one(item) for item in inputs]
+
+        workers = max_workers or os.cpu_count() or 1
+        if use_processes:
+            context = multiprocessing.get_context(BATCH_START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                chunksize = max(1, len(inputs) // (4 * workers))
+                return list(executor.map(self._reverse_one, inputs, chunksize=chunksize))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._reverse_one, inputs))
+
+    def _reverse_one(
+        self,
+        item: Tuple[WalletProfile, List[Trade], WalletAnalysis]
+    ) -> StrategyBlueprint:
+        """Run reverse_engineer for one batch item on a private reverser (the per-call caches are not shared)"""
+        reverser = StrategyReverser(self.min_confidence, self.min_evidence)
+        return reverser.reverse_engineer(*item)
+
+    def _build_blueprint(
+        self,
+        wallet: WalletProfile,
+        trades: List[Trade],
+        analysis: WalletAnalysis
+    ) -> StrategyBlueprint:
+        """Run the classifier and extractors for reverse_engineer"""
         # Classify strategy type
         strategy_type = self._classify_strategy(trades, analysis)
 
@@ -187,33 +535,19 @@ class StrategyReverser:
         sizing_rules = self.extract_sizing_rules(trades, strategy_type)
         market_filters = self.extract_market_selection(trades, strategy_type)
 
-        # Calculate performance metrics
-        estimated_edge = self._calculate_edge(trades, analysis)
-        capital_required = self._estimate_capital_required(trades, analysis)
-        replicability = self._calculate_replicability(
-            entry_rules, exit_rules, sizing_rules, market_filters
-        )
-
-        # Build blueprint
-        blueprint = StrategyBlueprint(
+        # Performance metrics and descriptions are only computed if a caller reads them
+        return DeferredBlueprint(
+            self, trades, analysis,
             name=f"{wallet.address[:10]}_strategy",
             strategy_type=strategy_type,
             entry_rules=entry_rules,
             exit_rules=exit_rules,
             sizing_rules=sizing_rules,
             market_filters=market_filters,
-            estimated_edge=estimated_edge,
-            capital_required=capital_required,
-            replicability_score=replicability,
-            timeframe=self._estimate_timeframe(trades, analysis),
             trade_frequency=wallet.total_trades / max(wallet.active_days, 1),
             win_rate=analysis.win_rate,
-            risk_profile=self._assess_risk_profile(strategy_type, trades, analysis),
-            additional_notes=self._generate_notes(strategy_type, trades, analysis)
         )
 
-        return blueprint
-
     def extract_entry_rules(
         self,
         trades: List[Trade],
@@ -271,12 +605,13 @@ class StrategyReverser:
 
         # Group trades by market to find entry/exit pairs
         market_positions = self._group_trades_by_market(trades)
+        presorted = self._is_presorted(trades)
 
         if strategy_type in [StrategyType.ARBITRAGE_BINARY, StrategyType.ARBITRAGE_MULTI]:
             # Arbitrage typically holds to resolution
             hold_to_resolution = sum(
                 1 for market_trades in market_positions.values()
-                if len([t for t in market_trades if t.side == "SELL"]) == 0
+                if not any(t.side == "SELL" for t in market_trades)
             )
 
             if hold_to_resolution / max(len(market_positions), 1) > 0.8:
@@ -295,13 +630,21 @@ class StrategyReverser:
             stop_losses = []
 
             for market_trades in market_positions.values():
-                buys = [t for t in market_trades if t.side == "BUY"]
-                sells = [t for t in market_trades if t.side == "SELL"]
+                buys, sells = [], []
+                for t in market_trades:
+                    if t.side == "BUY":
+                        buys.append(t)
+                    elif t.side == "SELL":
+                        sells.append(t)
+                if not presorted:
+                    sells.sort(key=lambda x: x.timestamp)
+                sell_times = [s.timestamp for s in sells]
 
                 for buy in buys:
-                    matching_sells = [s for s in sells if s.timestamp > buy.timestamp]
-                    if matching_sells:
-                        sell = min(matching_sells, key=lambda x: x.timestamp)
+                    # First sell strictly after the buy (earliest in input order on ties)
+                    idx = bisect_right(sell_times, buy.timestamp)
+                    if idx < len(sells):
+                        sell = sells[idx]
                         holding_periods.append((sell.timestamp - buy.timestamp).total_seconds())
 
                         # Calculate profit
@@ -311,8 +654,8 @@ class StrategyReverser:
                         else:
                             stop_losses.append(abs(profit_pct))
 
-            if holding_periods:
-                avg_hold = statistics.mean(holding_periods)
+            if self._has_evidence(len(holding_periods)):
+                avg_hold = float(np.mean(holding_periods))
                 rules.append(Rule(
                     condition=f"Exit after {avg_hold/3600:.1f} hours average",
                     value=avg_hold,
@@ -322,8 +665,8 @@ class StrategyReverser:
                     metadata={"unit": "seconds", "type": "time_based"}
                 ))
 
-            if profit_targets:
-                avg_target = statistics.mean(profit_targets)
+            if self._has_evidence(len(profit_targets)):
+                avg_target = float(np.mean(profit_targets))
                 rules.append(Rule(
                     condition=f"Take profit at ~{avg_target:.1f}% gain",
                     value=avg_target,
@@ -333,8 +676,8 @@ class StrategyReverser:
                     metadata={"unit": "percent", "type": "profit_target"}
                 ))
 
-            if stop_losses:
-                avg_stop = statistics.mean(stop_losses)
+            if self._has_evidence(len(stop_losses)):
+                avg_stop = float(np.mean(stop_losses))
                 rules.append(Rule(
                     condition=f"Stop loss at ~{avg_stop:.1f}% loss",
                     value=-avg_stop,
@@ -368,12 +711,16 @@ class StrategyReverser:
         rules = []
 
         # Analyze trade values ($ amount per trade)
-        trade_values = [t.value for t in trades if t.side == "BUY"]
+        cols = self._columnize(trades)
+        is_buy = cols.side == SIDE_BUY
+        all_values = cols.value
+        trade_values = all_values[is_buy]
 
-        if trade_values:
-            avg_size = statistics.mean(trade_values)
-            median_size = statistics.median(trade_values)
-            stdev_size = statistics.stdev(trade_values) if len(trade_values) > 1 else 0
+        if trade_values.size:
+            avg_size = float(trade_values.mean())
+            median_size = float(np.median(trade_values))
+            stdev_size = float(trade_values.std(ddof=1)) if trade_values.size > 1 else 0
+            min_size, max_size = float(trade_values.min()), float(trade_values.max())
 
             # Check if sizing is fixed or dynamic
             cv = stdev_size / avg_size if avg_size > 0 else 0  # Coefficient of variation
@@ -389,28 +736,28 @@ class StrategyReverser:
                 ))
             else:  # Dynamic sizing
                 rules.append(Rule(
-                    condition=f"Dynamic sizing: ${median_size:.0f} typical (${min(trade_values):.0f}-${max(trade_values):.0f} range)",
+                    condition=f"Dynamic sizing: ${median_size:.0f} typical (${min_size:.0f}-${max_size:.0f} range)",
                     value=median_size,
                     confidence=0.7,
                     evidence_count=len(trade_values),
                     rule_type=RuleType.SIZING_RULE,
                     metadata={
                         "type": "dynamic",
-                        "min": min(trade_values),
-                        "max": max(trade_values),
+                        "min": min_size,
+                        "max": max_size,
                         "std": stdev_size
                     }
                 ))
 
         # Check for scaling patterns over time
         if len(trades) > 100:
-            early_trades = trades[:len(trades)//3]
-            late_trades = trades[-len(trades)//3:]
+            early, late = slice(None, len(trades) // 3), slice(-len(trades) // 3, None)
+            early_values = all_values[early][is_buy[early]]
+            late_values = all_values[late][is_buy[late]]
+            early_avg = float(early_values.mean()) if early_values.size else 0.0
+            late_avg = float(late_values.mean()) if late_values.size else 0.0
 
-            early_avg = statistics.mean([t.value for t in early_trades if t.side == "BUY"])
-            late_avg = statistics.mean([t.value for t in late_trades if t.side == "BUY"])
-
-            if late_avg > early_avg * 1.5:  # 50% increase suggests compounding
+            if early_avg > 0 and late_avg > early_avg * 1.5:  # 50% increase suggests compounding
                 rules.append(Rule(
                     condition="Compound profits (position size grows over time)",
                     value=late_avg / early_avg,
@@ -462,18 +809,28 @@ class StrategyReverser:
         # Analyze market titles for keywords
         market_keywords = Counter()
         market_types = Counter()
+        timeframes = Counter()  # Timeframe preferences (if metadata contains this)
+
+        # Wallets trade the same markets repeatedly, so tokenize each title once
+        title_keywords: Dict[str, Tuple[str, ...]] = {}
 
         for trade in trades:
             # Extract keywords from market title
-            title_lower = trade.market_title.lower()
-            keywords = title_lower.split()
-
-            for keyword in keywords:
-                if len(keyword) > 3:  # Skip short words
-                    market_keywords[keyword] += 1
-
+            keywords = title_keywords.get(trade.market_title)
+            if keywords is None:
+                keywords = tuple(
+                    word for word in trade.market_title.lower().split()
+                    if len(word) > 3  # Skip short words
+                )
+                title_keywords[trade.market_title] = keywords
+
+            market_keywords.update(keywords)
             market_types[trade.market_type] += 1
 
+            timeframe = trade.metadata.get("timeframe")
+            if timeframe is not None or "timeframe" in trade.metadata:
+                timeframes[timeframe] += 1
+
         # Most common market themes
         top_keywords = market_keywords.most_common(10)
         if top_keywords:
@@ -501,12 +858,7 @@ class StrategyReverser:
                     metadata={"market_type_distribution": dict(market_types)}
                 ))
 
-        # Check for timeframe preferences (if metadata contains this)
-        timeframes = Counter()
-        for trade in trades:
-            if "timeframe" in trade.metadata:
-                timeframes[trade.metadata["timeframe"]] += 1
-
+        # Check for timeframe preferences
         if timeframes:
             for timeframe, count in timeframes.most_common(3):
                 confidence = count / len(trades)
@@ -532,80 +884,56 @@ class StrategyReverser:
         Returns:
             Formatted pseudocode string
         """
-        lines = []
-        lines.append("=" * 80)
-        lines.append(f"STRATEGY: {blueprint.name}")
-        lines.append(f"TYPE: {blueprint.strategy_type.value}")
-        lines.append(f"REPLICABILITY: {blueprint.replicability_score:.1%}")
-        lines.append("=" * 80)
-        lines.append("")
+        buf = io.StringIO()
+        w = buf.write
 
-        lines.append("# INITIALIZATION")
-        lines.append(f"capital = ${blueprint.capital_required:,.0f}")
-        lines.append(f"expected_trades_per_day = {blueprint.trade_frequency:.0f}")
-        lines.append(f"expected_win_rate = {blueprint.win_rate:.1%}")
-        lines.append("")
+        w(_PSEUDO_HEADER % (
+            blueprint.name, blueprint.strategy_type.value, blueprint.replicability_score * 100,
+            format(blueprint.capital_required, ",.0f"), blueprint.trade_frequency, blueprint.win_rate * 100,
+        ))
 
         if blueprint.market_filters:
-            lines.append("# MARKET SELECTION")
-            lines.append("while True:")
-            lines.append("    markets = get_all_active_markets()")
-            lines.append("    filtered_markets = []")
-            lines.append("    for market in markets:")
+            w(_PSEUDO_MARKET_SELECTION)
             for rule in blueprint.market_filters:
-                lines.append(f"        if {rule.condition}:  # confidence: {rule.confidence:.1%}")
-                lines.append("            filtered_markets.append(market)")
-            lines.append("")
+                w(_PSEUDO_FILTER % (rule.condition, rule.confidence * 100))
+            w("\n")
 
         if blueprint.entry_rules:
-            lines.append("    # ENTRY LOGIC")
-            lines.append("    for market in filtered_markets:")
-            lines.append("        opportunity = analyze_market(market)")
-            lines.append("        ")
+            w(_PSEUDO_ENTRY)
             for i, rule in enumerate(blueprint.entry_rules):
-                prefix = "if" if i == 0 else "and"
-                lines.append(f"        {prefix} {rule.condition}:  # confidence: {rule.confidence:.1%}")
-            lines.append("            # Calculate position size")
+                w(_PSEUDO_RULE % ("if" if i == 0 else "and", rule.condition, rule.confidence * 100))
+            w("            # Calculate position size\n")
 
             if blueprint.sizing_rules:
                 for rule in blueprint.sizing_rules:
-                    lines.append(f"            # {rule.condition}")
-                lines.append(f"            size = calculate_size(capital, opportunity)")
+                    w(f"            # {rule.condition}\n")
+                w("            size = calculate_size(capital, opportunity)\n")
             else:
-                lines.append("            size = default_size")
+                w("            size = default_size\n")
 
-            lines.append("            ")
-            lines.append("            # Execute trade")
-            lines.append("            enter_position(market, size)")
-            lines.append("")
+            w(_PSEUDO_EXECUTE)
 
         if blueprint.exit_rules:
-            lines.append("    # EXIT LOGIC")
-            lines.append("    for position in open_positions:")
+            w(_PSEUDO_EXIT)
             for i, rule in enumerate(blueprint.exit_rules):
-                prefix = "if" if i == 0 else "elif"
-                lines.append(f"        {prefix} {rule.condition}:  # confidence: {rule.confidence:.1%}")
-                lines.append("            close_position(position)")
-            lines.append("")
+                w(_PSEUDO_RULE % ("if" if i == 0 else "elif", rule.condition, rule.confidence * 100))
+                w("            close_position(position)\n")
+            w("\n")
 
-        lines.append("    sleep(check_interval)")
-        lines.append("")
-
-        lines.append("# EXPECTED PERFORMANCE")
+        w("    sleep(check_interval)\n\n# EXPECTED PERFORMANCE\n")
         for key, value in blueprint.estimated_edge.items():
-            lines.append(f"# {key}: {value}")
-        lines.append(f"# Risk Profile: {blueprint.risk_profile}")
-        lines.append(f"# Typical Timeframe: {blueprint.timeframe}")
-        lines.append("")
+            w(f"# {key}: {value}\n")
+        w(f"# Risk Profile: {blueprint.risk_profile}\n")
+        w(f"# Typical Timeframe: {blueprint.timeframe}\n\n")
 
         if blueprint.additional_notes:
-            lines.append("# NOTES")
+            w("# NOTES\n")
             for note_line in blueprint.additional_notes.split("\n"):
-                lines.append(f"# {note_line}")
+                w(f"# {note_line}\n")
 
-        lines.append("=" * 80)
+        w(_SEP)
 
-        return "\n".join(lines)
+        return buf.getvalue()
 
     # Helper methods
 
@@ -618,29 +946,32 @@ class StrategyReverser:
         if not trades:
             return StrategyType.HYBRID
 
-        # Check for arbitrage patterns
-        market_positions = self._group_trades_by_market(trades)
+        # Check for arbitrage patterns (per-market flags over the market buckets)
+        cols = self._columnize(trades)
+        buckets = self._market_buckets(trades)
+        n_markets = len(buckets)
+        buy = cols.side == SIDE_BUY
+        buy_codes = cols.market_code[buy]
+        buy_outcomes = cols.outcome_id[buy]
 
         # Binary arbitrage: paired YES/NO positions
-        binary_arb_count = 0
-        for market_trades in market_positions.values():
-            outcomes = {t.outcome for t in market_trades if t.side == "BUY"}
-            if "YES" in outcomes and "NO" in outcomes:
-                binary_arb_count += 1
-
-        if binary_arb_count / max(len(market_positions), 1) > 0.7:
+        has_yes = np.zeros(n_markets, dtype=bool)
+        has_no = np.zeros(n_markets, dtype=bool)
+        has_yes[buy_codes[buy_outcomes == YES_ID]] = True
+        has_no[buy_codes[buy_outcomes == NO_ID]] = True
+        binary_arb_count = int((has_yes & has_no).sum())
+
+        # Multi-outcome arbitrage: buying 3+ different outcomes of a multi market
+        n_outcomes = len(cols.outcomes)
+        bought = np.unique(buy_codes.astype(np.int64) * n_outcomes + buy_outcomes)
+        distinct_outcomes = np.bincount(bought // n_outcomes, minlength=n_markets)
+        first_is_multi = cols.market_type[buckets.order[buckets.starts]] == MARKET_MULTI
+        multi_arb_count = int((first_is_multi & (distinct_outcomes >= 3)).sum())
+
+        if binary_arb_count / max(n_markets, 1) > 0.7:
             return StrategyType.ARBITRAGE_BINARY
 
-        # Multi-outcome arbitrage: buying all outcomes
-        multi_arb_count = 0
-        for market_id, market_trades in market_positions.items():
-            if market_trades and market_trades[0].market_type == "multi":
-                unique_outcomes = {t.outcome for t in market_trades if t.side == "BUY"}
-                # If buying 3+ different outcomes, likely multi-arb
-                if len(unique_outcomes) >= 3:
-                    multi_arb_count += 1
-
-        if multi_arb_count / max(len(market_positions), 1) > 0.5:
+        if multi_arb_count / max(n_markets, 1) > 0.5:
             return StrategyType.ARBITRAGE_MULTI
 
         # Market maker: high trade frequency, small spreads
@@ -660,36 +991,43 @@ class StrategyReverser:
 
         # Find paired YES+NO entries
         market_positions = self._group_trades_by_market(trades)
-        paired_entries = []
+        presorted = self._is_presorted(trades)
+        pair_costs = []
+        tick = timedelta(microseconds=1)
+        window_us = ARB_PAIR_WINDOW // tick
 
         for market_trades in market_positions.values():
             buys = [t for t in market_trades if t.side == "BUY"]
             yes_buys = [t for t in buys if t.outcome == "YES"]
             no_buys = [t for t in buys if t.outcome == "NO"]
+            if not presorted:
+                yes_buys.sort(key=lambda t: t.timestamp)
+                no_buys.sort(key=lambda t: t.timestamp)
+            if not yes_buys or not no_buys:
+                continue
+
+            # Exact integer microseconds from the market's first YES buy
+            base = yes_buys[0].timestamp
+            pair_costs.append(_pair_costs_kernel(
+                np.fromiter(((t.timestamp - base) // tick for t in yes_buys), dtype=np.int64, count=len(yes_buys)),
+                np.fromiter((t.price for t in yes_buys), dtype=np.float64, count=len(yes_buys)),
+                np.fromiter(((t.timestamp - base) // tick for t in no_buys), dtype=np.int64, count=len(no_buys)),
+                np.fromiter((t.price for t in no_buys), dtype=np.float64, count=len(no_buys)),
+                window_us,
+            ))
+
+        combined_costs = np.concatenate(pair_costs) if pair_costs else np.empty(0)
 
-            # Match YES/NO pairs by timestamp proximity
-            for yes_trade in yes_buys:
-                for no_trade in no_buys:
-                    time_diff = abs((yes_trade.timestamp - no_trade.timestamp).total_seconds())
-                    if time_diff < 60:  # Within 1 minute = likely paired
-                        combined_cost = yes_trade.price + no_trade.price
-                        paired_entries.append({
-                            "combined_cost": combined_cost,
-                            "yes_price": yes_trade.price,
-                            "no_price": no_trade.price,
-                            "edge": 1.0 - combined_cost
-                        })
-
-        if paired_entries:
-            avg_threshold = statistics.mean([p["combined_cost"] for p in paired_entries])
+        if self._has_evidence(combined_costs.size):
+            avg_threshold = float(combined_costs.mean())
             rules.append(Rule(
                 condition=f"sum(best_bid_yes + best_bid_no) < {avg_threshold:.3f}",
                 value=avg_threshold,
                 confidence=0.9,
-                evidence_count=len(paired_entries),
+                evidence_count=int(combined_costs.size),
                 rule_type=RuleType.ENTRY_CONDITION,
                 metadata={
-                    "avg_edge": statistics.mean([p["edge"] for p in paired_entries]),
+                    "avg_edge": 1.0 - avg_threshold,
                     "type": "binary_arbitrage"
                 }
             ))
@@ -698,7 +1036,7 @@ class StrategyReverser:
                 condition="Buy equal shares of YES and NO",
                 value="paired_hedge",
                 confidence=0.95,
-                evidence_count=len(paired_entries),
+                evidence_count=int(combined_costs.size),
                 rule_type=RuleType.ENTRY_CONDITION,
                 metadata={"type": "hedging"}
             ))
@@ -733,10 +1071,10 @@ class StrategyReverser:
                     "edge": 1.0 - cost_per_set if cost_per_set < 1 else 0
                 })
 
-        if multi_entries:
-            avg_outcomes = statistics.mean([e["outcomes_count"] for e in multi_entries])
-            avg_cost = statistics.mean([e["cost_per_set"] for e in multi_entries])
-            avg_edge = statistics.mean([e["edge"] for e in multi_entries])
+        if self._has_evidence(len(multi_entries)):
+            avg_outcomes = _mean([e["outcomes_count"] for e in multi_entries])
+            avg_cost = _mean([e["cost_per_set"] for e in multi_entries])
+            avg_edge = _mean([e["edge"] for e in multi_entries])
 
             rules.append(Rule(
                 condition=f"sum(all_outcome_prices) < {avg_cost:.3f}",
@@ -768,16 +1106,17 @@ class StrategyReverser:
 
         # Analyze spreads and timing
         # This is simplified - real MM analysis would need order book data
-        buys = [t for t in trades if t.side == "BUY"]
+        cols = self._columnize(trades)
+        buy_prices = cols.price[cols.side == SIDE_BUY]
 
-        if buys:
-            avg_price = statistics.mean([t.price for t in buys])
+        if self._has_evidence(buy_prices.size):
+            avg_price = float(buy_prices.mean())
 
             rules.append(Rule(
                 condition=f"Post limit orders at mid ± spread_target",
                 value=avg_price,
                 confidence=0.7,
-                evidence_count=len(buys),
+                evidence_count=int(buy_prices.size),
                 rule_type=RuleType.ENTRY_CONDITION,
                 metadata={"type": "market_making", "avg_entry_price": avg_price}
             ))
@@ -789,33 +1128,32 @@ class StrategyReverser:
         rules = []
 
         # Analyze entry prices and outcomes
-        buys = [t for t in trades if t.side == "BUY"]
+        cols = self._columnize(trades)
+        buy_mask = cols.side == SIDE_BUY
+        yes_prices = cols.price[buy_mask & (cols.outcome_id == YES_ID)]
+        no_prices = cols.price[buy_mask & (cols.outcome_id == NO_ID)]
 
-        if buys:
-            yes_buys = [t for t in buys if t.outcome == "YES"]
-            no_buys = [t for t in buys if t.outcome == "NO"]
-
-            if yes_buys:
-                avg_yes_price = statistics.mean([t.price for t in yes_buys])
-                rules.append(Rule(
-                    condition=f"Buy YES when undervalued (avg entry: {avg_yes_price:.2f})",
-                    value=avg_yes_price,
-                    confidence=0.6,
-                    evidence_count=len(yes_buys),
-                    rule_type=RuleType.ENTRY_CONDITION,
-                    metadata={"direction": "bullish"}
-                ))
+        if self._has_evidence(yes_prices.size):
+            avg_yes_price = float(yes_prices.mean())
+            rules.append(Rule(
+                condition=f"Buy YES when undervalued (avg entry: {avg_yes_price:.2f})",
+                value=avg_yes_price,
+                confidence=0.6,
+                evidence_count=int(yes_prices.size),
+                rule_type=RuleType.ENTRY_CONDITION,
+                metadata={"direction": "bullish"}
+            ))
 
-            if no_buys:
-                avg_no_price = statistics.mean([t.price for t in no_buys])
-                rules.append(Rule(
-                    condition=f"Buy NO when overvalued (avg entry: {avg_no_price:.2f})",
-                    value=avg_no_price,
-                    confidence=0.6,
-                    evidence_count=len(no_buys),
-                    rule_type=RuleType.ENTRY_CONDITION,
-                    metadata={"direction": "bearish"}
-                ))
+        if self._has_evidence(no_prices.size):
+            avg_no_price = float(no_prices.mean())
+            rules.append(Rule(
+                condition=f"Buy NO when overvalued (avg entry: {avg_no_price:.2f})",
+                value=avg_no_price,
+                confidence=0.6,
+                evidence_count=int(no_prices.size),
+                rule_type=RuleType.ENTRY_CONDITION,
+                metadata={"direction": "bearish"}
+            ))
 
         return rules
 
@@ -826,14 +1164,15 @@ class StrategyReverser:
         # Analyze entry timing
         if len(trades) > 1:
             # Look for clustering of trades (suggests event triggers)
-            trade_times = sorted([t.timestamp for t in trades])
-            time_gaps = [(trade_times[i+1] - trade_times[i]).total_seconds()
-                        for i in range(len(trade_times)-1)]
+            trade_us = self._columnize(trades).ts
+            if not self._is_presorted(trades):
+                trade_us = np.sort(trade_us)
+            time_gaps = np.diff(trade_us)
 
             # Find rapid sequences (gap < 10 seconds)
-            rapid_sequences = sum(1 for gap in time_gaps if gap < 10)
+            rapid_sequences = int((time_gaps < 10_000_000).sum())
 
-            if rapid_sequences / len(time_gaps) > 0.3:
+            if rapid_sequences / time_gaps.size > 0.3:
                 rules.append(Rule(
                     condition="Trigger on rapid market events (< 10s response time)",
                     value=10,
@@ -846,33 +1185,93 @@ class StrategyReverser:
         return rules
 
     def _group_trades_by_market(self, trades: List[Trade]) -> Dict[str, List[Trade]]:
-        """Group trades by market ID"""
+        """Group trades by market ID (reused within one reverse_engineer call; treat as read-only)"""
+        cached = self._grouped_cache
+        if cached is not None and cached[0] is trades:
+            return cached[1]
+
         groups = defaultdict(list)
         for trade in trades:
             groups[trade.market_id].append(trade)
         return dict(groups)
 
+    def _has_evidence(self, count: int) -> bool:
+        """True if a rule backed by count observations could pass the min_evidence filter (skip building it otherwise)"""
+        return count > 0 and count >= self.min_evidence
+
+    def _is_presorted(self, trades: List[Trade]) -> bool:
+        """True if trades is the time-sorted list reverse_engineer is working on"""
+        cached = self._grouped_cache
+        return cached is not None and cached[0] is trades
+
+    def _columnize(self, trades: List[Trade]) -> TradeColumns:
+        """Build TradeColumns in one pass (reused within one reverse_engineer call; treat as read-only)"""
+        cached = self._columns_cache
+        if cached is not None and cached[0] is trades:
+            return cached[1]
+
+        n = len(trades)
+        ts = np.empty(n, dtype=np.int64)
+        price = np.empty(n, dtype=np.float64)
+        value = np.empty(n, dtype=np.float64)
+        shares = np.empty(n, dtype=np.float64)
+        side = np.empty(n, dtype=np.uint8)
+        outcome_id = np.empty(n, dtype=np.int32)
+        market_id = np.empty(n, dtype=object)
+        market_code = np.empty(n, dtype=np.int32)
+        market_type = np.empty(n, dtype=np.uint8)
+
+        outcome_ids = {"YES": YES_ID, "NO": NO_ID}
+        side_codes = {"BUY": SIDE_BUY, "SELL": SIDE_SELL}
+        market_index: Dict[str, int] = {}
+        base = trades[0].timestamp if trades else None
+        tick = timedelta(microseconds=1)
+
+        for i, t in enumerate(trades):
+            ts[i] = (t.timestamp - base) // tick
+            price[i] = t.price
+            value[i] = t.value
+            shares[i] = t.shares
+            side[i] = side_codes.get(t.side, SIDE_OTHER)
+            oid = outcome_ids.get(t.outcome)
+            if oid is None:
+                oid = outcome_ids[t.outcome] = len(outcome_ids)
+            outcome_id[i] = oid
+            market_id[i] = t.market_id
+            market_code[i] = market_index.setdefault(t.market_id, len(market_index))
+            market_type[i] = MARKET_MULTI if t.market_type == "multi" else MARKET_BINARY
+
+        return TradeColumns(
+            ts=ts, price=price, value=value, shares=shares, side=side,
+            outcome_id=outcome_id, outcomes=list(outcome_ids),
+            market_id=market_id, market_code=market_code, market_index=market_index,
+            market_type=market_type,
+        )
+
+    def _market_buckets(self, trades: List[Trade]) -> MarketBuckets:
+        """Bucket trade indices by market with one stable argsort over the market codes"""
+        cols = self._columnize(trades)
+        counts = np.bincount(cols.market_code, minlength=len(cols.market_index))
+        stops = np.cumsum(counts)
+        return MarketBuckets(
+            market_index=cols.market_index,
+            order=np.argsort(cols.market_code, kind="stable"),
+            starts=stops - counts,
+            stops=stops,
+        )
+
     def _calculate_max_concurrent_exposure(self, trades: List[Trade]) -> float:
         """Calculate maximum concurrent position exposure"""
         if not trades:
             return 0
 
-        # Sort trades by timestamp
-        sorted_trades = sorted(trades, key=lambda t: t.timestamp)
-
-        # Simulate running exposure
-        max_exposure = 0
-        current_exposure = 0
+        # Sweep buy (+value) and sell (-value) events in time order; ties keep input order
+        cols = self._columnize(trades)
+        signed = np.where(cols.side == SIDE_BUY, cols.value, -cols.value)
+        if not self._is_presorted(trades):
+            signed = signed[np.argsort(cols.ts, kind="stable")]
 
-        for trade in sorted_trades:
-            if trade.side == "BUY":
-                current_exposure += trade.value
-            else:
-                current_exposure -= trade.value
-
-            max_exposure = max(max_exposure, current_exposure)
-
-        return max_exposure
+        return float(_max_exposure_kernel(np.ascontiguousarray(signed)))
 
     def _calculate_edge(self, trades: List[Trade], analysis: WalletAnalysis) -> Dict[str, float]:
         """Calculate estimated edge metrics"""
@@ -920,33 +1319,33 @@ class StrategyReverser:
         High replicability = clear, simple rules with high confidence
         Low replicability = complex, opaque, or low-confidence patterns
         """
-        scores = []
-
-        # Score based on rule clarity
-        all_rules = entry_rules + exit_rules + sizing_rules + market_filters
-
-        if not all_rules:
+        # Score based on rule clarity (one pass gathers every per-rule input)
+        n_rules = 0
+        confidence_sum = 0.0
+        total_evidence = 0
+        rule_types_present = set()
+        for r in chain(entry_rules, exit_rules, sizing_rules, market_filters):
+            n_rules += 1
+            confidence_sum += r.confidence
+            total_evidence += r.evidence_count
+            rule_types_present.add(r.rule_type)
+
+        if not n_rules:
             return 0.3  # Unknown strategy
 
         # Average confidence across all rules
-        avg_confidence = statistics.mean([r.confidence for r in all_rules])
-        scores.append(avg_confidence)
+        avg_confidence = confidence_sum / n_rules
 
         # Completeness: do we have all rule types?
-        rule_types_present = {r.rule_type for r in all_rules}
         completeness = len(rule_types_present) / len(RuleType)
-        scores.append(completeness)
 
         # Evidence strength: higher evidence = more replicable
-        total_evidence = sum(r.evidence_count for r in all_rules)
         evidence_score = min(total_evidence / 1000, 1.0)  # Cap at 1000
-        scores.append(evidence_score)
 
         # Simplicity: fewer rules = easier to replicate
-        simplicity = max(0, 1 - len(all_rules) / 20)  # 20+ rules is complex
-        scores.append(simplicity * 0.5)  # Lower weight
+        simplicity = max(0, 1 - n_rules / 20)  # 20+ rules is complex
 
-        return statistics.mean(scores)
+        return (avg_confidence + completeness + evidence_score + simplicity * 0.5) / 4  # Simplicity at lower weight
 
     def _estimate_timeframe(self, trades: List[Trade], analysis: WalletAnalysis) -> str:
         """Estimate typical holding period"""
@@ -1017,6 +1416,31 @@ class StrategyReverser:
 
 # Utility functions for outputting blueprints
 
+@singledispatch
+def _serialize(obj):
+    """Convert enums and dataclasses to JSON-ready values (lists/dicts handled by the registered overloads)"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: _serialize(getattr(obj, f.name)) for f in fields(obj)}
+    if hasattr(obj, '__dict__'):
+        return {k: _serialize(v) for k, v in obj.__dict__.items()}
+    return obj
+
+
+@_serialize.register
+def _(obj: Enum):
+    return obj.value
+
+
+@_serialize.register
+def _(obj: list):
+    return [_serialize(item) for item in obj]
+
+
+@_serialize.register
+def _(obj: dict):
+    return {k: _serialize(v) for k, v in obj.items()}
+
+
 def to_json(blueprint: StrategyBlueprint) -> str:
     """
     Convert blueprint to JSON string
@@ -1027,20 +1451,7 @@ def to_json(blueprint: StrategyBlueprint) -> str:
     Returns:
         JSON string representation
     """
-    # Convert enums and dataclasses to dicts
-    def serialize(obj):
-        if isinstance(obj, Enum):
-            return obj.value
-        elif hasattr(obj, '__dict__'):
-            return {k: serialize(v) for k, v in obj.__dict__.items()}
-        elif isinstance(obj, list):
-            return [serialize(item) for item in obj]
-        elif isinstance(obj, dict):
-            return {k: serialize(v) for k, v in obj.items()}
-        else:
-            return obj
-
-    return json.dumps(serialize(blueprint), indent=2)
+    return json.dumps(_serialize(blueprint), indent=2)
 
 
 def to_markdown(blueprint: StrategyBlueprint) -> str:
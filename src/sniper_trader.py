@@ -34,6 +34,13 @@ from src.polymarket_client import (
     OrderBookLevel as SDKOrderBookLevel,
 )
 
+# Try to import uvloop (optional, faster event loop for the CLI entry point)
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 # =============================================================================
 # CONFIGURATION - OPTIMIZED FOR SNIPING
 # =============================================================================
@@ -140,7 +147,7 @@ def calculate_opportunity_score(
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderBookLevel:
     price: float
     size: float
@@ -187,7 +194,7 @@ class SniperTrader:
 
         # HTTP clients
         self.http_client = httpx.AsyncClient(timeout=ORDER_BOOK_TIMEOUT)
-        self.sdk_client = AsyncPolymarketClient()
+        self.sdk_client = AsyncPolymarketClient(client=self.http_client)
 
         # WebSocket for real-time order book streaming
         self.ws = MarketWebSocket(on_message=self._handle_ws_message)
@@ -325,10 +332,9 @@ class SniperTrader:
         try:
             book = await self.sdk_client.get_order_book(token_id)
             if book:
-                bids = [OrderBookLevel(price=l.price, size=l.size) for l in book.bids]
-                asks = [OrderBookLevel(price=l.price, size=l.size) for l in book.asks]
-                asks.sort(key=lambda x: x.price)
-                bids.sort(key=lambda x: x.price, reverse=True)
+                # SDK books arrive sorted best-first
+                bids = [OrderBookLevel(p, s) for p, s in zip(book.bid_px.tolist(), book.bid_sz.tolist())]
+                asks = [OrderBookLevel(p, s) for p, s in zip(book.ask_px.tolist(), book.ask_sz.tolist())]
                 # Update cache
                 with self._cache_lock:
                     self.order_book_cache[token_id] = (bids, asks)
@@ -959,7 +965,10 @@ def main():
         log("Portfolio reset")
         return
 
-    asyncio.run(run_sniper())
+    if UVLOOP_AVAILABLE:
+        uvloop.run(run_sniper())
+    else:
+        asyncio.run(run_sniper())
 
 
 if __name__ == "__main__":
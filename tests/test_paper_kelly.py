@@ -0,0 +1,63 @@
+"""
+Unit tests for Kelly position sizing.
+"""
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.paper_kelly import calculate_position_size, kelly_batch
+
+
+def test_kelly_batch_matches_scalar_sizing():
+    """Test that batch sizing agrees with calculate_position_size element-wise."""
+    rng = np.random.default_rng(11)
+    prices = rng.uniform(0.001, 0.99, 500)
+    fair = np.clip(prices + rng.uniform(-0.2, 0.3, 500), 0.0, 1.0)
+
+    bets, fractions, edges = kelly_batch(prices, fair, bankroll=10000.0, max_position_pct=0.02)
+
+    for i in range(len(prices)):
+        bet, kf, edge_pct = calculate_position_size(prices[i], fair[i], 10000.0, max_position_pct=0.02)
+        assert bets[i] == pytest.approx(bet)
+        assert fractions[i] == pytest.approx(kf)
+        assert edges[i] == pytest.approx(edge_pct)
+
+
+def test_kelly_kernel_compiled_matches_python():
+    """Test the numba-compiled kernel against its pure-Python body."""
+    pytest.importorskip("numba")
+    from src.paper_kelly import _kelly_kernel
+
+    rng = np.random.default_rng(5)
+    prices = rng.uniform(0.0, 1.0, 200)
+    prices[:3] = [0.0, 1.0, 0.5]
+    fair = rng.uniform(0.0, 1.0, 200)
+
+    for half_kelly in (True, False):
+        compiled = _kelly_kernel(prices, fair, half_kelly, 0.25)
+        expected = _kelly_kernel.py_func(prices, fair, half_kelly, 0.25)
+        assert np.allclose(compiled, expected)
+
+
+def test_longshot_sizing_from_batch_matches_scalar():
+    """Test that batch-sized longshots match the scalar sizing path."""
+    import src.paper_kelly as pk
+
+    price = 0.004
+    _, fractions, edges = kelly_batch(
+        np.array([price]), np.array([price * pk.LONGSHOT_EDGE_MULTIPLIER]),
+        bankroll=1.0, max_position_pct=pk.LONGSHOT_MAX_POSITION_PCT,
+    )
+
+    batched = pk.Portfolio(cash=5000.0)
+    scalar = pk.Portfolio(cash=5000.0)
+    a = pk.paper_trade_longshot(batched, "s", "q", price, sizing=(fractions[0], edges[0]))
+    b = pk.paper_trade_longshot(scalar, "s", "q", price)
+
+    assert a is not None and b is not None
+    assert a.cost_basis == pytest.approx(b.cost_basis)
+    assert batched.cash == pytest.approx(scalar.cash)
@@ -0,0 +1,490 @@
+"""
+Unit tests for the realistic paper trader fill simulation.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.paper_trader import (
+    PaperTrader, BookSide, BookStream, MAX_BOOK_DEPTH_PCT, MIN_LIQUIDITY_USD, MIN_POSITION_USD,
+)
+
+
+@pytest.fixture
+def trader(tmp_path, monkeypatch):
+    """PaperTrader with its portfolio database in a temp directory."""
+    monkeypatch.chdir(tmp_path)
+    return PaperTrader(starting_balance=1000.0)
+
+
+# ============================================================================
+# Test simulate_buy
+# ============================================================================
+
+def test_simulate_buy_walks_levels_within_depth_cap(trader):
+    """Test buying through one level and into the next, capped at 10% of depth."""
+    asks = BookSide.from_levels([(0.20, 1000), (0.10, 50)])  # unsorted input
+
+    fill = trader.simulate_buy(asks, 500)
+
+    # Depth is $205, so spend is capped at $20.50: $5 at 0.10, $15.50 at 0.20
+    assert fill.total_cost == pytest.approx(20.5)
+    assert fill.shares_filled == pytest.approx(50 + 15.5 / 0.20)
+    assert fill.book_depth_used_pct == pytest.approx(10.0)
+    assert fill.slippage_pct == pytest.approx((20.5 / 127.5 - 0.10) / 0.10 * 100)
+
+
+def test_simulate_buy_top_level_fast_path(trader):
+    """Test a spend that fits inside the first ask level."""
+    asks = BookSide.from_levels([(0.10, 10000), (0.20, 10000)])  # $3000 of depth
+
+    fill = trader.simulate_buy(asks, 50.0)
+
+    assert fill.shares_filled == pytest.approx(500.0)
+    assert fill.avg_price == pytest.approx(0.10)
+    assert fill.slippage_pct == 0.0
+    assert fill.book_depth_used_pct == pytest.approx(50.0 / 3000 * 100)
+
+
+def test_simulate_buy_thin_book(trader):
+    """Test that books below the liquidity minimum are skipped."""
+    assert trader.simulate_buy(BookSide.from_levels([(0.10, 100)]), 500) is None
+    assert trader.simulate_buy(BookSide.from_levels([]), 500) is None
+
+
+# ============================================================================
+# Test simulate_sell
+# ============================================================================
+
+def test_simulate_sell_partial_level(trader):
+    """Test selling through one full level and part of the next."""
+    bids = BookSide.from_levels([(0.50, 100), (0.40, 100), (0.30, 100)], descending=True)
+
+    fill = trader.simulate_sell(bids, 150)
+
+    assert fill.shares_filled == pytest.approx(150)
+    assert fill.total_cost == pytest.approx(0.50 * 100 + 0.40 * 50)
+    assert fill.avg_price == pytest.approx(70 / 150)
+    assert fill.slippage_pct == pytest.approx((0.50 - 70 / 150) / 0.50 * 100)
+
+
+def test_simulate_sell_exact_level_boundary(trader):
+    """Test selling exactly the size of the first level."""
+    bids = BookSide.from_levels([(0.50, 100), (0.40, 100)], descending=True)
+
+    fill = trader.simulate_sell(bids, 100)
+
+    assert fill.shares_filled == pytest.approx(100)
+    assert fill.avg_price == pytest.approx(0.50)
+    assert fill.slippage_pct == pytest.approx(0.0)
+
+
+def test_simulate_sell_exhausts_book(trader):
+    """Test that selling more than the book holds only fills available size."""
+    bids = BookSide.from_levels([(0.50, 100), (0.40, 100)], descending=True)
+
+    fill = trader.simulate_sell(bids, 500)
+
+    assert fill.shares_filled == pytest.approx(200)
+    assert fill.total_cost == pytest.approx(90)
+
+
+def test_simulate_sell_empty(trader):
+    """Test that an empty book or zero shares cannot fill."""
+    assert trader.simulate_sell(BookSide.from_levels([]), 100) is None
+    assert trader.simulate_sell(BookSide.from_levels([(0.50, 100)], descending=True), 0) is None
+
+
+# ============================================================================
+# Test exit checks (order book fetches mocked)
+# ============================================================================
+
+def test_book_side_orders_best_first():
+    """Reversed (CLOB order), sorted, and shuffled inputs all come out best-first."""
+    for levels in ([(0.10, 1), (0.20, 2), (0.30, 3)], [(0.30, 3), (0.20, 2), (0.10, 1)],
+                   [(0.20, 2), (0.30, 3), (0.10, 1)]):
+        bids = BookSide.from_levels(levels, descending=True)
+        asks = BookSide.from_levels(levels)
+        assert list(bids.prices) == [0.30, 0.20, 0.10]
+        assert list(bids.sizes) == [3, 2, 1]
+        assert list(asks.prices) == [0.10, 0.20, 0.30]
+        assert list(asks.sizes) == [1, 2, 3]
+
+
+def test_book_stream_applies_snapshot_then_deltas():
+    """Test that a book event seeds the stream and price_change levels update or delete."""
+    stream = BookStream()
+    stream.handle_message([{
+        "event_type": "book",
+        "asset_id": "tok",
+        "bids": [{"price": "0.10", "size": "50"}, {"price": "0.12", "size": "20"}],
+        "asks": [{"price": "0.15", "size": "30"}],
+    }])
+    stream.handle_message({
+        "event_type": "price_change",
+        "price_changes": [
+            {"asset_id": "tok", "price": "0.12", "size": "0", "side": "BUY"},
+            {"asset_id": "tok", "price": "0.14", "size": "10", "side": "SELL"},
+            {"asset_id": "other", "price": "0.50", "size": "10", "side": "SELL"},
+        ],
+    })
+
+    bids, asks = stream.get("tok")
+
+    assert list(bids.prices) == [0.10]
+    assert list(asks.prices) == [0.14, 0.15]
+    assert list(asks.sizes) == [10, 30]
+    assert stream.get("other") is None
+
+
+def test_book_stream_drops_books_on_disconnect():
+    """Test that a disconnect invalidates streamed books and blocks REST seeding until reconnect."""
+    stream = BookStream()
+    stream.subscribe(["tok"])
+    side = BookSide.from_levels([(0.2, 10.0)])
+    stream.handle_message({"event_type": "book", "asset_id": "tok", "bids": [], "asks": []})
+    assert stream.get("tok") is not None
+
+    stream._on_disconnect()
+    assert stream.get("tok") is None
+    stream.seed("tok", side, side)
+    assert stream.get("tok") is None
+
+    stream._on_connect()
+    stream.seed("tok", side, side)
+    assert stream.get("tok") == (side, side)
+
+
+def test_book_stream_resyncs_on_timestamp_gap():
+    """Test that a delta older than the book's last event drops the book for a REST re-sync."""
+    stream = BookStream()
+    stream.handle_message({
+        "event_type": "book", "asset_id": "tok", "timestamp": "2000",
+        "bids": [{"price": "0.10", "size": "50"}], "asks": [],
+    })
+    change = {"asset_id": "tok", "price": "0.11", "size": "5", "side": "BUY"}
+    stream.handle_message({"event_type": "price_change", "timestamp": "2500", "price_changes": [change]})
+    assert list(stream.get("tok")[0].prices) == [0.11, 0.10]
+
+    stream.handle_message({"event_type": "price_change", "timestamp": "2400", "price_changes": [change]})
+
+    assert stream.get("tok") is None
+    assert stream.gaps == 1
+
+
+# ============================================================================
+# Vectorized fills match a level-by-level walk
+# ============================================================================
+
+def _walk_buy(levels, spend):
+    """Reference loop: (shares_bought, cost) walking asks cheapest-first."""
+    bought = cost = 0.0
+    for price, size in levels:
+        take = min(price * size, spend - cost)
+        if take <= 0:
+            break
+        cost += take
+        bought += take / price
+    return bought, cost
+
+
+def test_simulate_buy_matches_reference_walk(trader):
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n = int(rng.integers(1, 30))
+        levels = sorted(zip(rng.uniform(0.01, 0.99, n), rng.uniform(100, 5000, n)))
+        liquidity = sum(price * size for price, size in levels)
+        spend = min(float(rng.uniform(10, 500)), liquidity * MAX_BOOK_DEPTH_PCT)
+
+        fill = trader.simulate_buy(BookSide.from_levels(levels), spend)
+        bought, cost = _walk_buy(levels, spend)
+
+        if fill is None:
+            assert spend < MIN_POSITION_USD or liquidity < MIN_LIQUIDITY_USD
+            continue
+        assert fill.shares_filled == pytest.approx(bought)
+        assert fill.total_cost == pytest.approx(cost)
+
+
+def _walk_sell(levels, shares_to_sell):
+    """Reference loop: (shares_sold, proceeds) walking bids best-first."""
+    sold = proceeds = 0.0
+    for price, size in levels:
+        take = min(size, shares_to_sell - sold)
+        if take <= 0:
+            break
+        sold += take
+        proceeds += take * price
+    return sold, proceeds
+
+
+def test_simulate_sell_matches_reference_walk(trader):
+    rng = np.random.default_rng(7)
+    for _ in range(200):
+        n = int(rng.integers(1, 30))
+        levels = sorted(zip(rng.uniform(0.01, 0.99, n), rng.uniform(1, 500, n)), reverse=True)
+        shares = float(rng.uniform(1, 5000))
+
+        fill = trader.simulate_sell(BookSide.from_levels(levels, descending=True), shares)
+        sold, proceeds = _walk_sell(levels, shares)
+
+        assert fill.shares_filled == pytest.approx(sold)
+        assert fill.total_cost == pytest.approx(proceeds)
+
+
+def _open_position(trader, token_id, entry_price=0.10, shares=100.0):
+    pos = {
+        "slug": f"slug-{token_id}",
+        "title": f"Market {token_id}",
+        "title_short": f"Market {token_id}",
+        "outcome": "Yes",
+        "token_id": token_id,
+        "entry_price": entry_price,
+        "shares": shares,
+        "amount_invested": entry_price * shares,
+        "entry_time": "2026-01-01T00:00:00",
+        "status": "open",
+        "exit_price": None,
+        "pnl": None,
+    }
+    trader.portfolio["positions"].append(pos)
+    trader._open_value += pos["amount_invested"]
+    return pos
+
+
+def test_remove_positions_keys_on_entry(trader):
+    first = _open_position(trader, "tok")
+    second = _open_position(trader, "tok")
+    second["entry_time"] = "2026-01-02T00:00:00"
+
+    trader._remove_positions([dict(first)])
+
+    assert trader.portfolio["positions"] == [second]
+
+
+@pytest.mark.asyncio
+async def test_open_position_uses_supplied_book(trader):
+    """Test that a pre-fetched book is used without another request."""
+    async def no_fetch(token_id):
+        raise AssertionError("book was supplied")
+
+    trader.fetch_order_book = no_fetch
+    book = (BookSide.from_levels([(0.09, 5000)], descending=True), BookSide.from_levels([(0.10, 5000)]))
+
+    opened = await trader.open_position("slug-x", "Market X", "Yes", "x", 0.10, book=book)
+
+    assert opened
+    [pos] = trader.portfolio["positions"]
+    assert pos["entry_price"] == pytest.approx(0.10)
+    assert trader._open_value == pytest.approx(pos["amount_invested"])
+
+
+@pytest.mark.asyncio
+async def test_check_profit_taking_flips_only_hot_positions(trader):
+    """Test that a 1.5x+ position is sold and a flat one is left open."""
+    hot = _open_position(trader, "hot")
+    flat = _open_position(trader, "flat")
+    books = {
+        "hot": (BookSide.from_levels([(0.16, 1000)], descending=True), BookSide.from_levels([(0.17, 1000)])),
+        "flat": (BookSide.from_levels([(0.10, 1000)], descending=True), BookSide.from_levels([(0.11, 1000)])),
+    }
+
+    async def fake_fetch(token_id):
+        return books[token_id]
+
+    trader.fetch_order_book = fake_fetch
+    taken = await trader.check_profit_taking()
+
+    assert [t["type"] for t in taken] == ["flip_1.5x"]
+    assert hot["status"] == "flip_1.5x"
+    assert hot["pnl"] == pytest.approx(0.16 * 100 - 10)
+    assert trader.portfolio["positions"] == [flat]
+    assert trader.portfolio["flips"] == 1
+    assert trader._open_value == pytest.approx(flat["amount_invested"])
+
+
+@pytest.mark.asyncio
+async def test_check_profit_taking_skips_unreachable_bids(trader):
+    """Test that a cold recent bid skips the fetch, but an old or hot one does not."""
+    cold = _open_position(trader, "cold")
+    stale = _open_position(trader, "stale")
+    hot = _open_position(trader, "hot")
+    now = time.monotonic()
+    trader._bid_cache = {"cold": (0.05, now), "stale": (0.05, now - 600), "hot": (0.13, now)}
+    fetched = []
+
+    async def fake_fetch(token_id):
+        fetched.append(token_id)
+        return BookSide.from_levels([(0.05, 1000)], descending=True), BookSide.from_levels([(0.06, 1000)])
+
+    trader.fetch_order_book = fake_fetch
+    await trader.check_profit_taking()
+
+    assert sorted(fetched) == ["hot", "stale"]
+
+
+@pytest.mark.asyncio
+async def test_check_time_based_exits_backfills_entry_ts(trader):
+    """Test that old positions get entry_ts from entry_time and only stale losers are cut."""
+    loser = _open_position(trader, "loser")
+    fresh = _open_position(trader, "fresh")
+    fresh["entry_ts"] = time.time()
+    bids = BookSide.from_levels([(0.04, 1000)], descending=True)
+
+    async def fake_fetch(token_id):
+        return bids, BookSide.from_levels([(0.05, 1000)])
+
+    trader.fetch_order_book = fake_fetch
+    cuts = await trader.check_time_based_exits()
+
+    assert cuts == [loser]
+    assert loser["entry_ts"] == datetime.fromisoformat(loser["entry_time"]).timestamp()
+    assert trader.portfolio["positions"] == [fresh]
+
+
+@pytest.mark.asyncio
+async def test_check_resolutions_batches_slugs(trader):
+    """Test that resolutions use one batched /events request for all slugs."""
+    won = _open_position(trader, "a")
+    still_open = _open_position(trader, "b")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        events = [
+            {"slug": "slug-a", "closed": True, "markets": [{"winner": "Yes"}]},
+            {"slug": "slug-b", "closed": False, "markets": [{}]},
+        ]
+        return httpx.Response(200, content=json.dumps(events))
+
+    trader.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    resolved = await trader.check_resolutions()
+
+    assert len(requests) == 1
+    assert requests[0].url.params.get_list("slug") == ["slug-a", "slug-b"]
+    assert resolved == [won]
+    assert won["status"] == "resolution_won"
+    assert trader.portfolio["positions"] == [still_open]
+    assert trader.portfolio["wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_event_batches_revalidate_with_etag(trader):
+    """Test that an unchanged batch is served from the last response on 304."""
+    seen_etags = []
+
+    def handler(request):
+        seen_etags.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        events = [{"slug": "slug-a", "closed": False, "markets": [{}]}]
+        return httpx.Response(200, content=json.dumps(events), headers={"ETag": '"v1"'})
+
+    trader.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first = await trader._fetch_resolutions(["slug-a"])
+    second = await trader._fetch_resolutions(["slug-a"])
+
+    assert seen_etags == [None, '"v1"']
+    assert first == second == {"slug-a": (False, None)}
+
+
+@pytest.mark.asyncio
+async def test_fetch_order_book_parses_clob_json(trader):
+    """Test string price/size levels in CLOB (worst-first) order come back best-first."""
+    book = {
+        "bids": [{"price": "0.10", "size": "50"}, {"price": "0.12", "size": "20"}],
+        "asks": [{"price": "0.15", "size": "30"}, {"price": "0.13", "size": "40"}],
+    }
+    trader.sdk_client = None
+    trader.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=json.dumps(book)))
+    )
+
+    bids, asks = await trader.fetch_order_book("tok", use_cache=False)
+
+    assert list(bids.prices) == [0.12, 0.10]
+    assert list(bids.sizes) == [20, 50]
+    assert list(asks.prices) == [0.13, 0.15]
+    assert list(asks.sizes) == [40, 30]
+
+
+@pytest.mark.asyncio
+async def test_fetch_order_book_uses_sdk_arrays(trader):
+    """Test that an SDK OrderBook's best-first arrays are used as-is."""
+    book = SimpleNamespace(
+        bid_px=np.array([0.12, 0.10]), bid_sz=np.array([20.0, 50.0]),
+        ask_px=np.array([0.13, 0.15]), ask_sz=np.array([40.0, 30.0]),
+    )
+
+    class FakeSDK:
+        async def get_order_book(self, token_id):
+            return book
+
+    trader.sdk_client = FakeSDK()
+
+    bids, asks = await trader.fetch_order_book("tok", use_cache=False)
+
+    assert bids.prices is book.bid_px
+    assert asks.sizes is book.ask_sz
+
+
+@pytest.mark.asyncio
+async def test_concurrent_book_fetches_share_one_request(trader):
+    """Test that checks fetching the same token at once send a single request."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=json.dumps({"bids": [{"price": "0.1", "size": "5"}], "asks": []}))
+
+    trader.sdk_client = None
+    trader.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first, second = await asyncio.gather(trader.fetch_order_book("tok"), trader.fetch_order_book("tok"))
+
+    assert len(requests) == 1
+    assert first[0] is second[0]
+    assert trader._book_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_async_save_round_trip(trader):
+    kept = _open_position(trader, "kept")
+    trader._changed_positions.append(kept)
+    await trader._save_portfolio_async()
+    assert trader._changed_positions == []
+    assert "db_id" in kept
+
+    kept["shares"] = 42.0
+    trader._changed_positions.append(kept)
+    await trader._save_portfolio_async()
+    await trader.close()
+
+    reloaded = PaperTrader(starting_balance=1000.0)
+    assert [pos["shares"] for pos in reloaded.portfolio["positions"]] == [42.0]
+    await reloaded.close()
+
+
+def test_recent_closed_newest_first_across_db_and_pending(trader):
+    """Test RECENT TRADES order: unsaved closes then saved rows, newest first."""
+    for i in range(4):
+        trader._pending_closed.append({"slug": "s", "title_short": f"saved{i}", "pnl": 0.0, "status": "closed"})
+    trader._save_portfolio()
+    for i in range(2):
+        trader._pending_closed.append({"slug": "s", "title_short": f"pending{i}", "pnl": 0.0, "status": "closed"})
+
+    recent = trader._recent_closed(5)
+
+    assert [pos["title_short"] for pos in recent] == ["pending1", "pending0", "saved3", "saved2", "saved1"]
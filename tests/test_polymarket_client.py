@@ -0,0 +1,414 @@
+"""
+Unit tests for the Polymarket REST/WebSocket client plumbing.
+"""
+
+import asyncio
+import json
+import types
+
+import httpx
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The SDK is only needed for ClobClient construction; stub it when it isn't installed
+try:
+    import py_clob_client.client  # noqa: F401
+except ImportError:
+    _sdk_client = types.ModuleType("py_clob_client.client")
+    _sdk_client.ClobClient = lambda *args, **kwargs: types.SimpleNamespace()
+    _sdk = types.ModuleType("py_clob_client")
+    _sdk.client = _sdk_client
+    sys.modules["py_clob_client"] = _sdk
+    sys.modules["py_clob_client.client"] = _sdk_client
+
+import src.polymarket_client as pc
+from src.polymarket_client import (
+    AsyncMarketWebSocket, MarketWebSocket, OrderBook, PolymarketClient, book_stats,
+    _book_stats_kernel, _book_stats_numpy, _dumps, _stack_side, _subscription_frames,
+)
+
+
+# ============================================================================
+# Test book_stats
+# ============================================================================
+
+def random_books(rng, n: int) -> list:
+    """Books with 0-8 random levels per side; every fifth book has an empty bid or ask side."""
+    books = []
+    for i in range(n):
+        n_bids, n_asks = rng.integers(0, 9, 2)
+        if i % 5 == 0:
+            n_bids = 0
+        elif i % 5 == 1:
+            n_asks = 0
+        bids = [{"price": p, "size": s} for p, s in zip(rng.uniform(0.01, 0.5, n_bids), rng.uniform(1, 500, n_bids))]
+        asks = [{"price": p, "size": s} for p, s in zip(rng.uniform(0.5, 0.99, n_asks), rng.uniform(1, 500, n_asks))]
+        books.append(OrderBook.from_levels(f"t{i}", bids, asks))
+    return books
+
+
+def test_book_stats_matches_per_book_values():
+    """Test midpoint, spread and top-5 VWAPs against a per-book computation, NaN for empty sides."""
+    books = random_books(np.random.default_rng(3), 60)
+
+    stats = book_stats(books, depth=5)
+
+    assert stats.shape == (60, 4)
+    for book, (mid, spread, bid_vwap, ask_vwap) in zip(books, stats):
+        if len(book.bid_px) and len(book.ask_px):
+            assert mid == pytest.approx((book.bid_px[0] + book.ask_px[0]) / 2)
+            assert spread == pytest.approx(book.ask_px[0] - book.bid_px[0])
+        else:
+            assert np.isnan(mid) and np.isnan(spread)
+        for px, sz, vwap in ((book.bid_px, book.bid_sz, bid_vwap), (book.ask_px, book.ask_sz, ask_vwap)):
+            if len(px):
+                assert vwap == pytest.approx(np.dot(px[:5], sz[:5]) / sz[:5].sum())
+            else:
+                assert np.isnan(vwap)
+    assert book_stats([]).shape == (0, 4)
+
+
+def test_book_stats_kernel_matches_numpy():
+    """Test the numba kernel against the NumPy fallback on random books."""
+    pytest.importorskip("numba")
+    books = random_books(np.random.default_rng(8), 200)
+    sides = (
+        _stack_side([b.bid_px for b in books], 5, np.nan),
+        _stack_side([b.bid_sz for b in books], 5, 0.0),
+        _stack_side([b.ask_px for b in books], 5, np.nan),
+        _stack_side([b.ask_sz for b in books], 5, 0.0),
+    )
+
+    compiled = _book_stats_kernel(*sides)
+
+    assert _book_stats_kernel is not _book_stats_numpy
+    np.testing.assert_allclose(compiled, _book_stats_numpy(*sides), equal_nan=True)
+
+
+# ============================================================================
+# Test PolymarketClient REST path and price cache
+# ============================================================================
+
+@pytest.fixture
+def rest_client(monkeypatch):
+    """PolymarketClient on a MockTransport, with a settable monotonic clock."""
+    calls = []
+    clock = [1000.0]
+
+    def handler(request):
+        calls.append((request.url.path, dict(request.url.params)))
+        if request.url.path == "/midpoint":
+            return httpx.Response(200, json={"mid": "0.42"})
+        if request.url.path == "/price":
+            return httpx.Response(200, json={"price": "0.4" if request.url.params["side"] == "SELL" else "0.44"})
+        if request.url.path == "/book":
+            return httpx.Response(200, json={
+                "bids": [{"price": "0.39", "size": "10"}, {"price": "0.41", "size": "5"}],
+                "asks": [{"price": "0.45", "size": "7"}],
+            })
+        return httpx.Response(500)
+
+    client = PolymarketClient()
+    client._http.close()
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(pc, "time", types.SimpleNamespace(monotonic=lambda: clock[0]))
+    client.calls = calls
+    client.clock = clock
+    yield client
+    client.close()
+
+
+def test_price_cache_serves_repeats_until_ttl_expires(rest_client):
+    """Test that a price is reused within PRICE_CACHE_TTL and refetched after it."""
+    assert rest_client.get_midpoint("a") == 0.42
+    rest_client.clock[0] += pc.PRICE_CACHE_TTL / 2
+    assert rest_client.get_midpoint("a") == 0.42
+    assert len(rest_client.calls) == 1
+
+    rest_client.clock[0] += pc.PRICE_CACHE_TTL
+    assert rest_client.get_midpoint("a") == 0.42
+    assert len(rest_client.calls) == 2
+
+
+def test_price_cache_keys_by_token_and_kind(rest_client):
+    """Test that sides, kinds and tokens don't share cache entries, and failures aren't cached."""
+    assert rest_client.get_price("a", "BUY") == 0.44
+    assert rest_client.get_price("a", "SELL") == 0.4
+    assert rest_client.get_midpoint("b") == 0.42
+    assert rest_client.get_last_trade_price("a") is None  # 500 from the mock
+    assert rest_client.get_last_trade_price("a") is None
+
+    paths = [path for path, _ in rest_client.calls]
+    assert paths == ["/price", "/price", "/midpoint", "/last-trade-price", "/last-trade-price"]
+    assert rest_client.calls[0][1] == {"token_id": "a", "side": "BUY"}
+
+
+def test_get_order_book_parses_raw_json(rest_client):
+    """Test the raw REST book path: string levels become best-first NumPy sides."""
+    book = rest_client.get_order_book("a")
+
+    assert book.best_bid == 0.41
+    assert book.best_ask == 0.45
+    assert book.bid_sz.tolist() == [5.0, 10.0]
+    assert rest_client.calls == [("/book", {"token_id": "a"})]
+
+
+# ============================================================================
+# Test frame decoding
+# ============================================================================
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_malformed_utf8_frame_is_reported_not_raised(monkeypatch, capsys, orjson_available):
+    """Test that raw bytes with bad UTF-8 count as a bad frame on either decoder."""
+    if orjson_available and not pc.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(pc, "ORJSON_AVAILABLE", orjson_available)
+    received = []
+    client = MarketWebSocket(on_message=received.append)
+
+    client._on_message(None, b'{"event_type": "book", "x": "\xff\xfe"}')
+    client._on_message(None, b'{"event_type": "book"}')
+
+    assert "Dropped 1 undecodable WebSocket frame(s)" in capsys.readouterr().out
+    assert received == [{"event_type": "book"}]
+
+
+# ============================================================================
+# Test subscription frames and the threaded MarketWebSocket
+# ============================================================================
+
+def test_subscription_frames_chunk_every_token():
+    """Test that frames hold at most WS_SUBSCRIBE_CHUNK tokens and cover the list in order."""
+    tokens = [f"t{i}" for i in range(2 * pc.WS_SUBSCRIBE_CHUNK + 50)]
+
+    frames = [json.loads(f) for f in _subscription_frames(_dumps, tokens, type="market")]
+
+    assert [len(f["assets_ids"]) for f in frames] == [pc.WS_SUBSCRIBE_CHUNK, pc.WS_SUBSCRIBE_CHUNK, 50]
+    assert [t for f in frames for t in f["assets_ids"]] == tokens
+    assert all(f["type"] == "market" for f in frames)
+
+
+class ScriptedApp:
+    """websocket.WebSocketApp whose run_forever plays one scripted outcome per connection."""
+
+    def __init__(self, client, outcomes):
+        self.client = client
+        self.outcomes = outcomes
+        self.sent = []
+        self.sock = types.SimpleNamespace(connected=False)
+
+    def __call__(self, url, on_open, on_message, on_error, on_close):
+        self.on_open = on_open
+        return self
+
+    def run_forever(self, **kwargs):
+        if self.outcomes.pop(0) == "open":
+            self.sock.connected = True
+            self.on_open(self)
+        self.sock.connected = False
+        if not self.outcomes:
+            self.client.running = False
+
+    def send(self, frame, opcode=None):
+        self.sent.append(json.loads(frame))
+
+
+def scripted_client(monkeypatch, outcomes, **kwargs):
+    client = MarketWebSocket(on_message=lambda data: None, **kwargs)
+    app = ScriptedApp(client, outcomes)
+    monkeypatch.setattr(pc.websocket, "WebSocketApp", app)
+    client.delays = []
+    client._stopped = types.SimpleNamespace(wait=client.delays.append)  # Record backoff instead of sleeping
+    return client, app
+
+
+def test_threaded_ws_reconnect_loop_backs_off_and_reports_drops(monkeypatch):
+    """Test that every drop fires on_disconnect and a successful open resets the backoff."""
+    drops = []
+    client, app = scripted_client(
+        monkeypatch, ["open", "fail", "fail", "open", "fail"], on_disconnect=lambda: drops.append(1)
+    )
+    client.running = True
+
+    client._connect()
+
+    assert len(drops) == 5
+    assert client.delays == [1, 2, 4, 1]
+
+
+def test_threaded_ws_reuses_resubscribe_frames_until_tokens_change(monkeypatch):
+    """Test that reconnects resend cached frames and (un)subscribe invalidates them."""
+    encodes = []
+
+    def counting_frames(*args, **kwargs):
+        encodes.append(1)
+        return _subscription_frames(*args, **kwargs)
+
+    monkeypatch.setattr(pc, "_subscription_frames", counting_frames)
+    client, app = scripted_client(monkeypatch, ["open", "open", "open", "open"])
+    client.subscribe(["a", "b"])  # Not connected: only recorded
+    encodes.clear()
+    client.running = True
+    client._connect()  # Resubscribe lands in app.sent on every open
+
+    sent_tokens = [sorted(f["assets_ids"]) for f in app.sent]
+    assert sent_tokens == [["a", "b"]] * 4
+    assert len(encodes) == 1
+    frames = client._resub_frames
+
+    client.subscribe(["c"])
+    assert client._resub_frames is None
+    client._resubscribe()
+    assert client._resub_frames is not frames
+    client.unsubscribe(["a"])
+    assert client._resub_frames is None
+
+    app.outcomes.append("open")
+    client.running = True
+    client._connect()
+    assert sorted(app.sent[-1]["assets_ids"]) == ["b", "c"]
+
+
+# ============================================================================
+# Test AsyncMarketWebSocket
+# ============================================================================
+
+class FakeConnection:
+    """websockets connection: records sent frames, yields queued messages, None closes it."""
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, frame):
+        self.sent.append(json.loads(frame))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.inbox.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Stand-in websockets module whose connect() hands out FakeConnections."""
+    fake = types.SimpleNamespace(connections=[])
+
+    def connect(url, **kwargs):
+        conn = FakeConnection()
+        fake.connections.append(conn)
+        return conn
+
+    fake.connect = connect
+    monkeypatch.setattr(pc, "websockets", fake, raising=False)
+    return fake
+
+
+async def wait_until(condition, timeout: float = 1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_async_ws_coalesces_subscription_changes(server):
+    """Test that changes within one window go out as one frame, net of cancellations."""
+    client = AsyncMarketWebSocket(on_message=lambda data: None)
+    client.start()
+    await wait_until(lambda: client.ws is not None)
+    conn = server.connections[0]
+
+    client.subscribe(["a"])
+    client.subscribe(["b", "c"])
+    client.unsubscribe(["a"])  # Never reached the server
+    await asyncio.sleep(pc.WS_SUBSCRIBE_COALESCE_SECONDS * 3)
+
+    assert len(conn.sent) == 1
+    assert sorted(conn.sent[0]["assets_ids"]) == ["b", "c"]
+    assert conn.sent[0]["type"] == "market"
+
+    client.unsubscribe(["b"])
+    client.unsubscribe(["c"])
+    await asyncio.sleep(pc.WS_SUBSCRIBE_COALESCE_SECONDS * 3)
+
+    assert len(conn.sent) == 2
+    assert sorted(conn.sent[1]["assets_ids"]) == ["b", "c"]
+    assert conn.sent[1]["operation"] == "unsubscribe"
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_ws_reconnect_resubscribes_full_set(server):
+    """Test that a reconnect drops queued deltas and resubscribes every token once."""
+    events = []
+    client = AsyncMarketWebSocket(
+        on_message=lambda data: None,
+        on_connect=lambda: events.append("connect"),
+        on_disconnect=lambda: events.append("disconnect"),
+    )
+    client.subscribe(["a", "b"])  # Not connected yet: sent with the full set
+    client.start()
+    await wait_until(lambda: client.ws is not None)
+    await wait_until(lambda: server.connections[0].sent)
+    assert sorted(server.connections[0].sent[0]["assets_ids"]) == ["a", "b"]
+
+    client._reconnect_delay = 0
+    client.subscribe(["c"])  # Still inside the coalescing window when the socket drops
+    await server.connections[0].inbox.put(None)
+    await wait_until(lambda: len(server.connections) == 2 and server.connections[1].sent)
+    await asyncio.sleep(pc.WS_SUBSCRIBE_COALESCE_SECONDS * 3)
+
+    assert len(server.connections[0].sent) == 1
+    assert len(server.connections[1].sent) == 1
+    assert sorted(server.connections[1].sent[0]["assets_ids"]) == ["a", "b", "c"]
+    assert events == ["connect", "disconnect", "connect"]
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_ws_get_message_wakes_on_arrival(server):
+    """Test that a waiting get_message returns as soon as a frame lands, and times out when idle."""
+    client = AsyncMarketWebSocket()
+    client.start()
+    await wait_until(lambda: client.ws is not None)
+
+    assert await client.get_message(timeout=0.01) is None
+
+    waiter = asyncio.create_task(client.get_message(timeout=1.0))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    await server.connections[0].inbox.put('{"event_type": "book", "asset_id": "a"}')
+
+    assert await asyncio.wait_for(waiter, 0.5) == {"event_type": "book", "asset_id": "a"}
+    await client.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_ws_stop_waits_for_task(server):
+    """Test that stop() leaves no pending connection task behind."""
+    events = []
+    client = AsyncMarketWebSocket(on_message=lambda data: None, on_disconnect=lambda: events.append("disconnect"))
+    client.start()
+    await wait_until(lambda: client.ws is not None)
+    task = client.task
+
+    await client.stop()
+
+    assert task.done()
+    assert client.task is None
+    assert events == ["disconnect"]
@@ -0,0 +1,393 @@
+"""
+Unit tests for strategy reverse engineering.
+"""
+
+import json
+import pickle
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.reverse import (
+    Rule, RuleType, StrategyBlueprint, StrategyReverser, StrategyType, Trade,
+    WalletAnalysis, WalletProfile, to_json,
+    MARKET_BINARY, MARKET_MULTI, SIDE_BUY, SIDE_SELL,
+    _max_exposure_kernel, _max_exposure_numpy, _pair_costs_kernel, _pair_costs_numpy,
+)
+
+T0 = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _trade(seconds, outcome, side="BUY", price=0.5, market_id="m1", shares=10.0):
+    return Trade(
+        timestamp=T0 + timedelta(seconds=seconds),
+        market_id=market_id,
+        market_title="Will it happen?",
+        outcome=outcome,
+        side=side,
+        shares=shares,
+        price=price,
+        value=shares * price,
+    )
+
+
+def _random_trades(seed, n=300):
+    rng = random.Random(seed)
+    return [
+        _trade(
+            rng.randint(0, 900),
+            rng.choice(["YES", "NO"]),
+            side=rng.choice(["BUY", "BUY", "SELL"]),
+            price=round(rng.uniform(0.05, 0.95), 3),
+            market_id=f"m{rng.randint(0, 3)}",
+        )
+        for _ in range(n)
+    ]
+
+
+def test_binary_arb_pairs_match_brute_force():
+    """Test that the sweep finds exactly the YES/NO buy pairs less than 60s apart."""
+    trades = _random_trades(3)
+    trades.append(_trade(2000, "YES", price=0.4))
+    trades.append(_trade(2060, "NO", price=0.5))  # Exactly 60s apart: not paired
+
+    expected = []
+    for market_id in {t.market_id for t in trades}:
+        buys = [t for t in trades if t.market_id == market_id and t.side == "BUY"]
+        for yes in (t for t in buys if t.outcome == "YES"):
+            for no in (t for t in buys if t.outcome == "NO"):
+                if abs((yes.timestamp - no.timestamp).total_seconds()) < 60:
+                    expected.append(yes.price + no.price)
+
+    rules = StrategyReverser()._extract_binary_arb_entry(trades)
+
+    assert rules[0].evidence_count == len(expected)
+    assert rules[0].value == pytest.approx(statistics.mean(expected))
+
+
+def test_pair_kernel_matches_numpy_sweep():
+    """Test that the (possibly numba-compiled) pairing kernel agrees with the NumPy version."""
+    rng = np.random.default_rng(7)
+    yes_us = np.sort(rng.integers(0, 600_000_000, 200))
+    no_us = np.sort(rng.integers(0, 600_000_000, 150))
+    yes_px, no_px = rng.uniform(0.1, 0.9, 200), rng.uniform(0.1, 0.9, 150)
+
+    expected = _pair_costs_numpy(yes_us, yes_px, no_us, no_px, 60_000_000)
+    got = _pair_costs_kernel(yes_us, yes_px, no_us, no_px, 60_000_000)
+
+    assert np.allclose(np.sort(got), np.sort(expected))
+
+
+def test_exit_rules_pair_each_buy_with_next_sell():
+    """Test that each buy is matched with the first sell strictly after it."""
+    trades = [
+        _trade(0, "YES", price=0.50),
+        _trade(100, "YES", side="SELL", price=0.60),
+        _trade(100, "YES", price=0.40),  # Same instant as the first sell: matches the later one
+        _trade(400, "YES", side="SELL", price=0.30),
+        _trade(500, "YES", price=0.45),  # No later sell
+    ]
+
+    rules = StrategyReverser(min_confidence=0, min_evidence=0).extract_exit_rules(
+        trades, strategy_type=None
+    )
+    by_type = {r.metadata["type"]: r for r in rules}
+
+    assert by_type["time_based"].value == pytest.approx((100 + 300) / 2)
+    assert by_type["profit_target"].value == pytest.approx(20.0)
+    assert by_type["stop_loss"].value == pytest.approx(-25.0)
+
+    # One profitable exit and one loss: neither can reach min_evidence=2
+    rules = StrategyReverser(min_confidence=0, min_evidence=2).extract_exit_rules(
+        trades, strategy_type=None
+    )
+    assert [r.metadata["type"] for r in rules] == ["time_based"]
+
+
+def test_reverse_engineer_binary_arb_wallet():
+    """Test an end-to-end blueprint for a wallet pairing YES/NO buys in every market."""
+    trades = []
+    for m in range(12):
+        trades.append(_trade(m * 600, "YES", price=0.48, market_id=f"m{m}"))
+        trades.append(_trade(m * 600 + 5, "NO", price=0.49, market_id=f"m{m}"))
+    wallet = WalletProfile("0xabc0000000000000", len(trades), 10, T0, 50.0, 1000.0)
+    analysis = WalletAnalysis(wallet, ["binary"], 4.85, timedelta(days=2), 0.95, 0.5, [12])
+
+    reverser = StrategyReverser(min_confidence=0.5, min_evidence=5)
+    blueprint = reverser.reverse_engineer(wallet, trades, analysis)
+
+    assert blueprint.strategy_type == StrategyType.ARBITRAGE_BINARY
+    assert blueprint.entry_rules[0].evidence_count == 12
+    assert blueprint.entry_rules[0].value == pytest.approx(0.97)
+    assert blueprint.exit_rules[0].value == "resolution"
+    assert reverser._grouped_cache is None
+
+    payload = json.loads(to_json(blueprint))
+    assert payload["strategy_type"] == "arbitrage_binary"
+    assert payload["entry_rules"][0]["evidence_count"] == 12
+
+
+def test_sizing_rules_match_statistics_module():
+    """Test that the NumPy sizing stats agree with the statistics module."""
+    trades = _random_trades(5)
+    buy_values = [t.value for t in trades if t.side == "BUY"]
+
+    rules = StrategyReverser(min_confidence=0, min_evidence=0).extract_sizing_rules(trades)
+    dynamic = next(r for r in rules if r.metadata.get("type") == "dynamic")
+
+    assert dynamic.value == pytest.approx(statistics.median(buy_values))
+    assert dynamic.metadata["std"] == pytest.approx(statistics.stdev(buy_values))
+    assert dynamic.metadata["min"] == min(buy_values)
+    assert dynamic.metadata["max"] == max(buy_values)
+
+
+def test_columnize_encodes_trade_fields():
+    """Test that the columnar view mirrors each trade's fields in order."""
+    trades = [
+        _trade(0, "YES", price=0.4),
+        _trade(1.5, "NO", side="SELL", price=0.6, market_id="m2"),
+        _trade(3, "Alice", price=0.2),
+    ]
+    trades[2].market_type = "multi"
+
+    cols = StrategyReverser()._columnize(trades)
+
+    assert cols.ts.tolist() == [0, 1_500_000, 3_000_000]
+    assert cols.side.tolist() == [SIDE_BUY, SIDE_SELL, SIDE_BUY]
+    assert [cols.outcomes[i] for i in cols.outcome_id] == ["YES", "NO", "Alice"]
+    assert cols.price.tolist() == [0.4, 0.6, 0.2]
+    assert cols.market_id.tolist() == ["m1", "m2", "m1"]
+    assert cols.market_type.tolist() == [MARKET_BINARY, MARKET_BINARY, MARKET_MULTI]
+
+
+def test_max_concurrent_exposure_matches_running_sum():
+    """Test the vectorized exposure sweep against a time-ordered running sum."""
+    trades = _random_trades(11)
+    trades.reverse()
+
+    running, expected = 0.0, 0.0
+    for t in sorted(trades, key=lambda t: t.timestamp):
+        running += t.value if t.side == "BUY" else -t.value
+        expected = max(expected, running)
+
+    assert StrategyReverser()._calculate_max_concurrent_exposure(trades) == pytest.approx(expected)
+
+
+def test_max_exposure_kernel_matches_numpy():
+    """Test that the (possibly numba-compiled) exposure kernel agrees with the NumPy version."""
+    signed = np.random.default_rng(3).normal(0, 50, 500)
+
+    assert _max_exposure_kernel(signed) == pytest.approx(_max_exposure_numpy(signed))
+    assert _max_exposure_kernel(-np.abs(signed)) == 0.0
+
+
+def test_directional_entry_averages_yes_and_no_buys():
+    """Test that directional entry rules average only the YES/NO buy prices."""
+    trades = [
+        _trade(0, "YES", price=0.30),
+        _trade(1, "YES", price=0.50),
+        _trade(2, "YES", side="SELL", price=0.90),
+        _trade(3, "NO", price=0.20),
+        _trade(4, "Maybe", price=0.99),
+    ]
+
+    yes_rule, no_rule = StrategyReverser(min_evidence=0)._extract_directional_entry(trades)
+
+    assert yes_rule.value == pytest.approx(0.40) and yes_rule.evidence_count == 2
+    assert no_rule.value == pytest.approx(0.20) and no_rule.evidence_count == 1
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_reverse_engineer_batch_matches_sequential(use_processes):
+    """Test that batch results match one-by-one calls and keep input order."""
+    inputs = []
+    for seed in range(3):
+        trades = _random_trades(seed, n=60)
+        wallet = WalletProfile(f"0x{seed:016x}", len(trades), 5, T0, 10.0, 500.0)
+        analysis = WalletAnalysis(wallet, ["binary"], 5.0, timedelta(hours=3), 0.6, 0.4, [12])
+        inputs.append((wallet, trades, analysis))
+
+    reverser = StrategyReverser(min_confidence=0.5, min_evidence=2)
+    batch = reverser.reverse_engineer_batch(inputs, use_processes=use_processes, max_workers=2)
+    sequential = [reverser.reverse_engineer(*item) for item in inputs]
+
+    assert [to_json(b) for b in batch] == [to_json(b) for b in sequential]
+
+
+def test_reverse_engineer_ignores_input_order():
+    """Test that shuffled input yields the same blueprint as time-ordered input."""
+    trades = _random_trades(9, n=150)
+    for i, t in enumerate(trades):
+        t.timestamp = T0 + timedelta(seconds=7 * i)  # Distinct instants: no tie-order ambiguity
+    shuffled = trades[:]
+    random.Random(1).shuffle(shuffled)
+    wallet = WalletProfile("0xdef0000000000000", len(trades), 5, T0, 10.0, 500.0)
+    analysis = WalletAnalysis(wallet, ["binary"], 5.0, timedelta(minutes=20), 0.6, 0.4, [12])
+
+    reverser = StrategyReverser(min_confidence=0.5, min_evidence=2)
+
+    assert to_json(reverser.reverse_engineer(wallet, shuffled, analysis)) == to_json(
+        reverser.reverse_engineer(wallet, trades, analysis)
+    )
+
+
+def test_generate_pseudocode_layout():
+    """Test the pseudocode frame and per-rule lines."""
+    blueprint = StrategyBlueprint(
+        name="0xabc_strategy",
+        strategy_type=StrategyType.DIRECTIONAL,
+        entry_rules=[Rule("price < 0.4", 0.4, 0.75, 20, RuleType.ENTRY_CONDITION)],
+        exit_rules=[Rule("Take profit at ~10% gain", 10, 0.7, 12, RuleType.EXIT_CONDITION)],
+        sizing_rules=[],
+        market_filters=[],
+        estimated_edge={"daily_pnl": 12.5},
+        capital_required=12345.6,
+        replicability_score=0.5,
+    )
+
+    text = StrategyReverser().generate_pseudocode(blueprint)
+    lines = text.split("\n")
+
+    assert lines[0] == lines[-1] == "=" * 80
+    assert "capital = $12,346" in lines
+    assert "        if price < 0.4:  # confidence: 75.0%" in lines
+    assert "        if Take profit at ~10% gain:  # confidence: 70.0%" in lines
+    assert "            size = default_size" in lines
+    assert "# daily_pnl: 12.5" in lines
+
+
+def test_multi_arb_entry_averages_per_market_sets():
+    """Test multi-outcome arbitrage cost/edge averages across markets."""
+    trades = []
+    for m, price in enumerate([0.30, 0.31]):
+        for outcome in ("A", "B", "C"):
+            trades.append(_trade(m * 60, outcome, price=price, market_id=f"m{m}"))
+    for t in trades:
+        t.market_type = "multi"
+
+    cost_rule, hedge_rule = StrategyReverser(min_evidence=0)._extract_multi_arb_entry(trades)
+
+    assert cost_rule.value == pytest.approx((0.90 + 0.93) / 2)
+    assert cost_rule.metadata["avg_edge"] == pytest.approx((0.10 + 0.07) / 2)
+    assert hedge_rule.value == 3
+
+
+def test_trade_interns_categorical_strings():
+    """Test that side/outcome/market_type built at runtime are interned."""
+    trade = Trade(T0, "m1", "title", "".join(["Y", "ES"]), "buy".upper(), 1.0, 0.5, 0.5,
+                  market_type="".join(["mul", "ti"]))
+
+    assert trade.side is sys.intern("BUY")
+    assert trade.outcome is sys.intern("YES")
+    assert trade.market_type is sys.intern("multi")
+
+
+def test_market_selection_counts_timeframes():
+    """Test keyword, market-type and timeframe filters from one pass over trades."""
+    trades = [_trade(i, "YES") for i in range(10)]
+    for t in trades[:7]:
+        t.metadata["timeframe"] = "15m"
+
+    rules = StrategyReverser().extract_market_selection(trades)
+    by_value = {r.value: r for r in rules}
+
+    assert by_value["will"].evidence_count == 10
+    assert by_value["binary"].confidence == pytest.approx(1.0)
+    assert by_value["15m"].confidence == pytest.approx(0.7)
+    assert by_value["15m"].metadata["timeframe_distribution"] == {"15m": 7}
+
+
+def test_blueprint_derived_fields_are_lazy():
+    """Test that derived blueprint fields are computed on first read, then the inputs are released."""
+    trades = _random_trades(4, n=80)
+    wallet = WalletProfile("0x1230000000000000", len(trades), 5, T0, 10.0, 500.0)
+    analysis = WalletAnalysis(wallet, ["binary"], 5.0, timedelta(hours=3), 0.6, 0.4, [12])
+    reverser = StrategyReverser(min_confidence=0.5, min_evidence=2)
+
+    blueprint = reverser.reverse_engineer(wallet, trades, analysis)
+    assert isinstance(blueprint, StrategyBlueprint)
+    assert "capital_required" not in vars(blueprint)
+
+    assert blueprint.capital_required == reverser._estimate_capital_required(trades, analysis)
+    assert "capital_required" in vars(blueprint)
+    assert blueprint._inputs is not None  # Other metrics still pending
+
+    restored = pickle.loads(pickle.dumps(blueprint))
+    assert blueprint._inputs is None and restored._inputs is None
+    assert restored == blueprint
+
+
+def test_deferred_replicability_is_validated():
+    """Test that a deferred replicability score is range-checked when computed."""
+    trades = _random_trades(4, n=40)
+    wallet = WalletProfile("0x1230000000000000", len(trades), 5, T0, 10.0, 500.0)
+    analysis = WalletAnalysis(wallet, ["binary"], 5.0, timedelta(hours=3), 0.6, 0.4, [12])
+    reverser = StrategyReverser()
+    reverser._calculate_replicability = lambda *rules: 1.5
+
+    blueprint = reverser.reverse_engineer(wallet, trades, analysis)
+
+    with pytest.raises(ValueError):
+        blueprint.replicability_score
+
+
+def test_sniper_entry_counts_rapid_gaps():
+    """Test the <10s gap count on unsorted input, including the exact 10s boundary."""
+    trades = [_trade(s, "YES") for s in (100, 0, 9.999999, 19.999999, 30, 300)]
+    # Sorted gaps: 9.999999, 10, 10.000001, 70, 200 -> one rapid gap out of five
+    assert StrategyReverser(min_evidence=0)._extract_sniper_entry(trades) == []
+
+    trades += [_trade(s, "NO") for s in (300.5, 301, 301.5)]
+    rules = StrategyReverser(min_evidence=0)._extract_sniper_entry(trades)
+
+    assert rules[0].evidence_count == 4
+
+
+def test_market_buckets_match_grouping():
+    """Test that every bucket slice holds the same trades as the dict grouping."""
+    trades = _random_trades(21)
+    reverser = StrategyReverser()
+
+    buckets = reverser._market_buckets(trades)
+    grouped = reverser._group_trades_by_market(trades)
+
+    assert len(buckets) == len(grouped)
+    for market_id, market_trades in grouped.items():
+        assert buckets.trades_for(trades, market_id) == market_trades
+
+
+def test_classify_multi_arbitrage_from_buckets():
+    """Test multi-outcome arbitrage needs 3+ bought outcomes in a multi market."""
+    trades = []
+    for m in range(4):
+        outcomes = ("A", "B", "C") if m < 3 else ("A", "B")
+        for outcome in outcomes:
+            trades.append(_trade(m * 60, outcome, market_id=f"m{m}"))
+        trades.append(_trade(m * 60 + 1, "D", side="SELL", market_id=f"m{m}"))
+    for t in trades:
+        t.market_type = "multi"
+
+    reverser = StrategyReverser()
+    assert reverser._classify_strategy(trades, None) == StrategyType.ARBITRAGE_MULTI
+
+    trades[0].market_type = trades[4].market_type = "binary"  # First trades of m0 / m1
+    assert reverser._classify_strategy(trades, None) == StrategyType.DIRECTIONAL
+
+
+def test_replicability_score_components():
+    """Test the fused replicability score against its four averaged components."""
+    entry = [Rule("a", 1, 0.9, 300, RuleType.ENTRY_CONDITION), Rule("b", 1, 0.7, 100, RuleType.ENTRY_CONDITION)]
+    exits = [Rule("c", 1, 0.8, 200, RuleType.EXIT_CONDITION)]
+
+    score = StrategyReverser()._calculate_replicability(entry, exits, [], [])
+
+    expected = (0.8 + 2 / 4 + 600 / 1000 + (1 - 3 / 20) * 0.5) / 4
+    assert score == pytest.approx(expected)
+    assert StrategyReverser()._calculate_replicability([], [], [], []) == 0.3